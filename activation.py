@@ -0,0 +1,51 @@
+import pygame
+from spatial import SpatialGrid
+
+class ActivationRegion:
+    # sprites only update within radius of the focus point, the others sleep until it comes close again.
+    # sprites tell whether they are idle enough to sleep through can_sleep() and get fall_asleep() and wake_up() calls
+    def __init__(self,group,radius,cell_size=256):
+        self.group=group
+        self.radius=radius
+        self.grid=SpatialGrid(cell_size)
+        self.awake={}
+
+    def add(self,sprite):
+        sprite.region=self
+        self.grid.insert(sprite)
+        self.awake[sprite]=None
+
+    def discard(self,sprite):
+        self.grid.remove(sprite)
+        self.awake.pop(sprite,None)
+
+    def wake(self,sprite):
+        if sprite not in self.awake:
+            sprite.wake_up()
+            self.awake[sprite]=None
+            self.group.wake(sprite)
+
+    def sleep(self,sprite):
+        sprite.fall_asleep()
+        del self.awake[sprite]
+        self.group.sleep(sprite)
+
+    def update(self,center):
+        x,y=center
+        radius=self.radius
+        near={}
+        for sprite in self.grid.query(pygame.Rect(x-radius,y-radius,2*radius,2*radius)):
+            if not sprite.alive():
+                self.discard(sprite)
+                continue
+            dx=sprite.rect.centerx-x
+            dy=sprite.rect.centery-y
+            if dx*dx+dy*dy<=radius*radius:
+                near[sprite]=None
+        for sprite in list(self.awake):
+            if not sprite.alive():
+                self.discard(sprite)
+            elif sprite not in near and sprite.can_sleep():
+                self.sleep(sprite)
+        for sprite in near:
+            self.wake(sprite)
@@ -0,0 +1,51 @@
+import os
+from types import MappingProxyType
+import pygame
+from atlas import Atlas
+from soundbank import SoundBank
+from settings import load_settings
+
+animations={}
+
+# every drawn image of the game shares these pages
+atlas=Atlas()
+
+# and these sound effects
+sounds=SoundBank()
+
+def load_image(path):
+    # surfaces can only be converted to the display format once there is a display
+    surface=pygame.image.load(path)
+    return surface.convert_alpha() if pygame.display.get_surface() else surface
+
+def pack(surfaces):
+    # headless games never draw, so nothing is packed without a display
+    surfaces=tuple(surfaces)
+    if pygame.display.get_surface() and load_settings()['texture_atlas']:
+        return tuple(atlas.pack(surfaces))
+    return surfaces
+
+def flash_surface(mask):
+    # white silhouette shown while an entity blinks after a hit
+    surface=mask.to_surface()
+    surface.set_colorkey((0,0,0))
+    return surface
+
+def load_animations(path):
+    # every folder under path is one animation, loaded once per process and shared by all entities
+    if path not in animations:
+        frames={}
+        masks={}
+        flashes={}
+        for folder in sorted(next(os.walk(path))[1]):
+            folder_path=os.path.join(path,folder)
+            frames[folder]=tuple(load_image(os.path.join(folder_path,file)) for file in sorted(os.listdir(folder_path)))
+            masks[folder]=tuple(pygame.mask.from_surface(surface) for surface in frames[folder])
+            flashes[folder]=tuple(flash_surface(mask) for mask in masks[folder])
+        # all frames of the path are packed together
+        for images in (frames,flashes):
+            packed=iter(pack(surface for folder in images for surface in images[folder]))
+            for folder in images:
+                images[folder]=tuple(next(packed) for _ in images[folder])
+        animations[path]=(MappingProxyType(frames),MappingProxyType(masks),MappingProxyType(flashes))
+    return animations[path]
@@ -0,0 +1,66 @@
+import pygame
+
+class Shelf:
+    def __init__(self,y,height):
+        self.y=y
+        self.height=height
+        self.x=0
+
+class Atlas:
+    # packs small surfaces onto a few large pages, row by row in shelves of similar height.
+    # packed surfaces are handed back as subsurfaces of their page, so masks and rects keep working,
+    # and drawing code can blit the page with an area rect instead
+    def __init__(self,size=2048):
+        self.size=size
+        self.pages=[]
+        self.shelves=[]
+        self.regions={}
+
+    def new_page(self,width,height):
+        # oversized surfaces get a page of their own
+        page=pygame.Surface((max(width,self.size),max(height,self.size)),pygame.SRCALPHA).convert_alpha()
+        self.pages.append(page)
+        self.shelves.append([])
+        return len(self.pages)-1
+
+    def place(self,width,height):
+        # the lowest fitting shelf wastes the least space, a new shelf opens below the last one
+        best=None
+        for index,shelves in enumerate(self.shelves):
+            page_width,page_height=self.pages[index].get_size()
+            for shelf in shelves:
+                if height<=shelf.height and shelf.x+width<=page_width and (best is None or shelf.height<best[1].height):
+                    best=(index,shelf)
+            top=shelves[-1].y+shelves[-1].height if shelves else 0
+            if best is None and top+height<=page_height and width<=page_width:
+                shelves.append(Shelf(top,height))
+                best=(index,shelves[-1])
+        if best is None:
+            index=self.new_page(width,height)
+            self.shelves[index].append(Shelf(0,height))
+            best=(index,self.shelves[index][0])
+        index,shelf=best
+        x=shelf.x
+        shelf.x+=width
+        return index,pygame.Rect(x,shelf.y,width,height)
+
+    def pack(self,surfaces):
+        # returns the packed surfaces in the order given, tallest ones are placed first
+        surfaces=list(surfaces)
+        packed=[None]*len(surfaces)
+        for index in sorted(range(len(surfaces)),key=lambda index:-surfaces[index].get_height()):
+            surface=surfaces[index]
+            if surface in self.regions:
+                packed[index]=surface
+                continue
+            page,rect=self.place(*surface.get_size())
+            # a plain blit would blend translucent pixels into the empty page, max copies them as they are
+            self.pages[page].blit(surface.convert_alpha(),rect,special_flags=pygame.BLEND_RGBA_MAX)
+            region=self.pages[page].subsurface(rect)
+            self.regions[region]=(self.pages[page],rect)
+            packed[index]=region
+        return packed
+
+    def source(self,surface):
+        # page and area to blit for a packed surface, the surface itself otherwise
+        return self.regions.get(surface,(surface,None))
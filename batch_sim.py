@@ -0,0 +1,506 @@
+import os
+import time
+import argparse
+import numpy as np
+from controllers import Controls,IdleController,RandomController,ScriptedController
+from level import load_level
+from tilegrid import TileGrid
+
+LEFT,RIGHT,JUMP,DUCK,SHOOT=range(len(Controls._fields))
+
+# player statuses are a facing plus one of these suffixes
+SUFFIXES=('','_idle','_jump','_duck')
+RUN,IDLE,AIRBORNE,DUCKING=range(len(SUFFIXES))
+FACINGS=('left','right')
+
+def overlap(x,y,w,h,other_x,other_y,other_w,other_h):
+    # pygame.Rect.colliderect on arrays
+    return (x<other_x+other_w)&(x+w>other_x)&(y<other_y+other_h)&(y+h>other_y)
+
+class BatchSimulation:
+    # steps many independent worlds of the same level at once, one array row per world.
+    # the rules and their order follow Game.tick for a headless game, so a row stays
+    # identical to a Game driven by the same inputs (see validate)
+    def __init__(self,count,reference,bullet_capacity=64):
+        self.count=count
+        self.dt=reference.sim_clock.step
+        self.ticks=0
+
+        # static geometry is shared by all worlds
+        tile_grid=getattr(reference.collision_sprites,'tile_grid',None)
+        if tile_grid is None:
+            tile_grid=TileGrid(load_level(os.path.join('data','map.tmx')).get_layer_by_name('Level'),64)
+        self.solid=tile_grid.solid
+        self.tile_size=tile_grid.tile_size
+
+        self.setup_player(reference.player)
+        self.setup_enemies([sprite for sprite in reference.vulnerable_sprites if sprite is not reference.player])
+        self.setup_platforms(reference.platform_sprites.sprites())
+        self.setup_bullets(reference.bullets,bullet_capacity)
+
+    def setup_player(self,player):
+        count=self.count
+        self.player_size=player.rect.size
+        self.speed=player.speed
+        self.gravity=player.gravity
+        self.jump_speed=player.jump_speed
+        self.player_cooldown=player.cooldown
+        self.invul_duration=player.invul_duration
+
+        # status lookup by facing and suffix
+        names=[facing+suffix for facing in FACINGS for suffix in SUFFIXES]
+        self.player_frames=np.array([len(player.animations[name]) for name in names])
+        self.player_masks=[player.masks[name] for name in names]
+
+        self.x=np.full(count,player.rect.x,dtype=np.int64)
+        self.y=np.full(count,player.rect.y,dtype=np.int64)
+        self.old_x=self.x.copy()
+        self.old_y=self.y.copy()
+        self.position_x=np.full(count,player.position.x)
+        self.position_y=np.full(count,player.position.y)
+        self.direction_x=np.full(count,player.direction.x)
+        self.direction_y=np.full(count,player.direction.y)
+        self.on_floor=np.full(count,player.on_floor)
+        self.moving_floor=np.full(count,-1)
+        self.duck=np.full(count,player.duck)
+        self.facing=np.full(count,FACINGS.index(player.status.split('_')[0]))
+        self.suffix=np.full(count,SUFFIXES.index(player.status[len(player.status.split('_')[0]):]))
+        self.frameidx=np.full(count,float(player.frameidx))
+        self.health=np.full(count,player.health)
+        self.alive=np.ones(count,dtype=bool)
+        self.can_shoot=np.full(count,player.can_shoot)
+        self.shoot_time=np.zeros(count,dtype=np.int64)
+        self.vulnerable=np.full(count,player.is_vulnerable)
+        self.hit_time=np.zeros(count,dtype=np.int64)
+
+    def setup_enemies(self,enemies):
+        count=self.count
+        shape=(count,len(enemies))
+        self.enemy_rects=np.array([tuple(enemy.rect) for enemy in enemies],dtype=np.int64).reshape(-1,4)
+        self.enemy_cooldown=enemies[0].cooldown if enemies else 0
+        self.enemy_frames=np.array([len(enemies[0].animations[name]) for name in FACINGS]) if enemies else np.ones(2,dtype=int)
+        self.enemy_masks=[enemies[0].masks[name] for name in FACINGS] if enemies else []
+
+        self.enemy_facing=np.tile([FACINGS.index(enemy.status) for enemy in enemies],(count,1))
+        self.enemy_frameidx=np.zeros(shape)
+        self.enemy_health=np.tile([enemy.health for enemy in enemies],(count,1))
+        self.enemy_alive=np.ones(shape,dtype=bool)
+        self.enemy_can_shoot=np.ones(shape,dtype=bool)
+        self.enemy_shoot_time=np.zeros(shape,dtype=np.int64)
+        self.enemy_vulnerable=np.ones(shape,dtype=bool)
+        self.enemy_hit_time=np.zeros(shape,dtype=np.int64)
+
+    def setup_platforms(self,platforms):
+        count=self.count
+        self.platform_rects=np.array([tuple(platform.rect) for platform in platforms],dtype=np.int64).reshape(-1,4)
+        self.platform_speed=platforms[0].speed if platforms else 0
+        self.platform_borders=[[tuple(border) for border in platform.borders] for platform in platforms]
+        # only the vertical state differs between worlds
+        self.platform_y=np.tile(self.platform_rects[:,1],(count,1))
+        self.platform_old_y=np.tile([platform.old_rect.y for platform in platforms],(count,1))
+        self.platform_position=np.tile([platform.position.y for platform in platforms],(count,1))
+        self.platform_direction=np.tile([platform.direction.y for platform in platforms],(count,1))
+
+    def setup_bullets(self,pool,capacity):
+        count=self.count
+        self.bullet_size=(pool.width,pool.height)
+        self.bullet_speed=pool.speed
+        self.bullet_lifetime=pool.lifetime
+        self.bullet_masks={side:pool.sprites.masks[side] for side in (-1,1)}
+        self.bullet_x=np.zeros((count,capacity))
+        self.bullet_y=np.zeros((count,capacity))
+        self.bullet_side=np.ones((count,capacity),dtype=np.int64)
+        self.bullet_start=np.zeros((count,capacity),dtype=np.int64)
+        self.bullet_alive=np.zeros((count,capacity),dtype=bool)
+
+    def get_ticks(self):
+        # same rounding as SimulationClock.get_ticks
+        return int(self.ticks*self.dt*1000)
+
+    def step(self,controls):
+        # controls is a bool array of shape (count,5) in Controls field order.
+        # a world stops once its player has died, like Game.run_headless
+        active=self.alive.copy()
+        now=self.get_ticks()
+        self.platform_collisions(active)
+        self.move_bullets(active)
+        self.update_player(active,np.asarray(controls,dtype=bool),now)
+        self.update_enemies(active,now)
+        self.move_platforms(active)
+        self.bullet_collisions(active,now)
+        self.ticks+=1
+        # bullets run out as the clock advances, like their timers in Game
+        self.expire_bullets(active,self.get_ticks())
+
+    # bullets
+    def spawn(self,worlds,x,y,side,now):
+        # one bullet per world in worlds, each takes the first free slot of its row
+        worlds=np.flatnonzero(worlds)
+        if not len(worlds):
+            return
+        free=~self.bullet_alive[worlds]
+        if not free.any(axis=1).all():
+            self.grow_bullets()
+            free=~self.bullet_alive[worlds]
+        slots=free.argmax(axis=1)
+        self.bullet_x[worlds,slots]=x[worlds]
+        self.bullet_y[worlds,slots]=y[worlds]
+        self.bullet_side[worlds,slots]=side[worlds]
+        self.bullet_start[worlds,slots]=now
+        self.bullet_alive[worlds,slots]=True
+
+    def grow_bullets(self):
+        capacity=self.bullet_alive.shape[1]
+        self.bullet_x=np.concatenate((self.bullet_x,np.zeros((self.count,capacity))),axis=1)
+        self.bullet_y=np.concatenate((self.bullet_y,np.zeros((self.count,capacity))),axis=1)
+        self.bullet_side=np.concatenate((self.bullet_side,np.ones((self.count,capacity),dtype=np.int64)),axis=1)
+        self.bullet_start=np.concatenate((self.bullet_start,np.zeros((self.count,capacity),dtype=np.int64)),axis=1)
+        self.bullet_alive=np.concatenate((self.bullet_alive,np.zeros((self.count,capacity),dtype=bool)),axis=1)
+
+    def move_bullets(self,active):
+        alive=self.bullet_alive&active[:,None]
+        # the pool moves x and y by direction*speed*dt, y only ever gains zero
+        self.bullet_x[alive]+=self.bullet_side[alive]*self.bullet_speed*self.dt
+
+    def expire_bullets(self,active,now):
+        self.bullet_alive[active[:,None]&(now-self.bullet_start>self.bullet_lifetime)]=False
+
+    def bullet_rects(self,worlds,slots):
+        width,height=self.bullet_size
+        x=np.rint(self.bullet_x[worlds,slots]).astype(np.int64)-width//2
+        y=np.rint(self.bullet_y[worlds,slots]).astype(np.int64)-height//2
+        return x,y
+
+    def bullet_collisions(self,active,now):
+        worlds,slots=np.nonzero(self.bullet_alive&active[:,None])
+        if not len(worlds):
+            return
+        width,height=self.bullet_size
+        x,y=self.bullet_rects(worlds,slots)
+
+        # obstacles, a bullet covers at most two tiles in each direction
+        size=self.tile_size
+        rows,columns=self.solid.shape
+        wall=np.zeros(len(worlds),dtype=bool)
+        left,top=x//size,y//size
+        right,bottom=(x+width-1)//size,(y+height-1)//size
+        for row in (0,1):
+            for column in (0,1):
+                cell_x,cell_y=left+column,top+row
+                inside=(cell_x<=right)&(cell_y<=bottom)&(cell_x>=0)&(cell_y>=0)&(cell_x<columns)&(cell_y<rows)
+                wall|=inside&self.solid[np.clip(cell_y,0,rows-1),np.clip(cell_x,0,columns-1)]
+        for index,(platform_x,_,platform_w,platform_h) in enumerate(self.platform_rects):
+            wall|=overlap(x,y,width,height,platform_x,self.platform_y[worlds,index],platform_w,platform_h)
+        self.bullet_alive[worlds[wall],slots[wall]]=False
+
+        # entities, rects first and masks only for the few bullets touching one
+        keep=~wall
+        worlds,slots,x,y=worlds[keep],slots[keep],x[keep],y[keep]
+        player_w,player_h=self.player_size
+        player_hit=self.alive[worlds]&overlap(x,y,width,height,self.x[worlds],self.y[worlds],player_w,player_h)
+        enemy_x,enemy_y,enemy_w,enemy_h=(self.enemy_rects[:,index] for index in range(4))
+        enemy_hit=self.enemy_alive[worlds]&overlap(x[:,None],y[:,None],width,height,enemy_x,enemy_y,enemy_w,enemy_h)
+        damaged_player=np.zeros(self.count,dtype=bool)
+        damaged_enemies=np.zeros(self.enemy_alive.shape,dtype=bool)
+        for index in np.flatnonzero(player_hit|enemy_hit.any(axis=1)):
+            world=worlds[index]
+            mask=self.bullet_masks[self.bullet_side[world,slots[index]]]
+            # the first entity in group order takes the bullet, the player comes first
+            if player_hit[index] and self.player_mask(world).overlap(mask,(x[index]-self.x[world],y[index]-self.y[world])):
+                damaged_player[world]=True
+                self.bullet_alive[world,slots[index]]=False
+                continue
+            for enemy in np.flatnonzero(enemy_hit[index]):
+                if self.enemy_mask(world,enemy).overlap(mask,(x[index]-enemy_x[enemy],y[index]-enemy_y[enemy])):
+                    damaged_enemies[world,enemy]=True
+                    self.bullet_alive[world,slots[index]]=False
+                    break
+
+        # Entity.damage
+        damaged=damaged_player&self.vulnerable
+        self.health[damaged]-=1
+        self.vulnerable[damaged]=False
+        self.hit_time[damaged]=now
+        damaged=damaged_enemies&self.enemy_vulnerable
+        self.enemy_health[damaged]-=1
+        self.enemy_vulnerable[damaged]=False
+        self.enemy_hit_time[damaged]=now
+
+    # player
+    def player_status(self):
+        return self.facing*len(SUFFIXES)+self.suffix
+
+    def player_mask(self,world):
+        return self.player_masks[self.player_status()[world]][int(self.frameidx[world])]
+
+    def update_player(self,active,controls,now):
+        dt=self.dt
+        self.old_x=self.x.copy()
+        self.old_y=self.y.copy()
+
+        # Player.input
+        left=active&controls[:,LEFT]
+        right=active&~controls[:,LEFT]&controls[:,RIGHT]
+        self.direction_x[active]=np.where(left,-1.0,np.where(right,1.0,0.0))[active]
+        self.facing[left]=0
+        self.facing[right]=1
+        self.suffix[left|right]=RUN
+        jump=active&controls[:,JUMP]&self.on_floor
+        self.direction_y[jump]=-self.jump_speed
+        self.duck[active&~jump]=controls[active&~jump,DUCK]
+        self.direction_x[active&self.duck&self.on_floor]=0
+        shoot=active&controls[:,SHOOT]&self.can_shoot
+        if shoot.any():
+            side=np.where(self.facing==1,1,-1)
+            width,height=self.player_size
+            x=self.x+width//2+side*80
+            y=self.y+height//2+np.where(self.duck,10,-16)
+            self.spawn(shoot,x.astype(float),y.astype(float),side,now)
+            self.can_shoot[shoot]=False
+            self.shoot_time[shoot]=now
+
+        # Player.get_status
+        self.suffix[active&(self.direction_x==0)&self.on_floor]=IDLE
+        self.suffix[active&(self.direction_y!=0)&~self.on_floor]=AIRBORNE
+        self.suffix[active&self.on_floor&self.duck]=DUCKING
+
+        # Player.move
+        self.position_x[active]+=self.direction_x[active]*self.speed*dt
+        self.x[active]=np.rint(self.position_x[active])
+        self.collision(active,True)
+        self.direction_y[active]+=self.gravity*dt
+        self.position_y[active]+=self.direction_y[active]*dt
+        riding=active&(self.moving_floor>=0)&(self.direction_y>0)
+        if riding.any():
+            worlds=np.flatnonzero(riding)
+            platforms=self.moving_floor[worlds]
+            down=self.platform_direction[worlds,platforms]>0
+            worlds,platforms=worlds[down],platforms[down]
+            self.direction_y[worlds]=0
+            self.y[worlds]=self.platform_y[worlds,platforms]-self.player_size[1]
+            self.position_y[worlds]=self.y[worlds]
+            self.on_floor[worlds]=True
+        self.y[active]=np.rint(self.position_y[active])
+        self.collision(active,False)
+        self.moving_floor[active]=-1
+
+        self.check_contact(active)
+
+        # Entity.animate
+        self.frameidx[active]+=7*dt
+        self.frameidx[active&(self.frameidx>=self.player_frames[self.player_status()])]=0
+
+        # timers and death
+        self.can_shoot[active&~self.can_shoot&(now-self.shoot_time>self.player_cooldown)]=True
+        self.vulnerable[active&~self.vulnerable&(now-self.hit_time>self.invul_duration)]=True
+        self.alive[active&(self.health<=0)]=False
+
+    def cells(self,left,top,right,bottom):
+        # TileGrid.cells on arrays of rect edges
+        rows,columns=self.solid.shape
+        size=self.tile_size
+        return (
+            np.maximum(left//size,0),np.maximum(top//size,0),
+            np.minimum(np.maximum(right-1,left)//size,columns-1),np.minimum(np.maximum(bottom-1,top)//size,rows-1)
+        )
+
+    def solid_cells(self,active,left,top,right,bottom):
+        # yields (worlds,x,y) per solid tile, row-major like TileGrid.near
+        rows,columns=self.solid.shape
+        left,top,right,bottom=self.cells(left,top,right,bottom)
+        height=np.where(active,bottom-top+1,0).max(initial=0)
+        width=np.where(active,right-left+1,0).max(initial=0)
+        for row in range(height):
+            for column in range(width):
+                cell_x,cell_y=left+column,top+row
+                worlds=active&(cell_x<=right)&(cell_y<=bottom)
+                worlds&=self.solid[np.minimum(cell_y,rows-1),np.minimum(cell_x,columns-1)]
+                if worlds.any():
+                    yield worlds,cell_x*self.tile_size,cell_y*self.tile_size
+
+    def collision(self,active,horizontal):
+        # Player.collision, the tiles of the grown area in row-major order followed by the platforms
+        width,height=self.player_size
+        size=self.tile_size
+        left=np.minimum(self.x,self.old_x)-64
+        top=np.minimum(self.y,self.old_y)-64
+        right=np.maximum(self.x,self.old_x)+width+64
+        bottom=np.maximum(self.y,self.old_y)+height+64
+        for worlds,x,y in self.solid_cells(active,left,top,right,bottom):
+            self.resolve(worlds,horizontal,x,y,size,size,x,y)
+        for index,(x,_,platform_w,platform_h) in enumerate(self.platform_rects):
+            self.resolve(active,horizontal,x,self.platform_y[:,index],platform_w,platform_h,x,self.platform_old_y[:,index])
+        self.on_floor[active&self.on_floor&(self.direction_y!=0)]=False
+
+    def resolve(self,worlds,horizontal,x,y,w,h,old_x,old_y):
+        width,height=self.player_size
+        hit=worlds&overlap(self.x,self.y,width,height,x,y,w,h)
+        if not hit.any():
+            return
+        if horizontal:
+            side=hit&(self.x<=x+w)&(self.old_x>=old_x+w)
+            self.x=np.where(side,x+w,self.x)
+            side=hit&(self.x+width>=x)&(self.old_x+width<=old_x)
+            self.x=np.where(side,x-width,self.x)
+            self.position_x[hit]=self.x[hit]
+        else:
+            side=hit&(self.y+height>=y)&(self.old_y+height<=old_y)
+            self.y=np.where(side,y-height,self.y)
+            self.on_floor|=side
+            # the original compares the old top against the current bottom
+            side=hit&(self.y<=y+h)&(self.old_y>=y+h)
+            self.y=np.where(side,y+h,self.y)
+            self.position_y[hit]=self.y[hit]
+            self.direction_y[hit]=0
+
+    def check_contact(self,active):
+        width,height=self.player_size
+        bottom=self.y+height
+        falling=self.direction_y>0
+        for worlds,x,y in self.solid_cells(active,self.x,bottom,self.x+width,bottom+5):
+            self.on_floor|=worlds&falling&overlap(self.x,bottom,width,5,x,y,self.tile_size,self.tile_size)
+        for index,(x,_,platform_w,platform_h) in enumerate(self.platform_rects):
+            touching=active&overlap(self.x,bottom,width,5,x,self.platform_y[:,index],platform_w,platform_h)
+            self.on_floor|=touching&falling
+            self.moving_floor[touching]=index
+
+    # enemies
+    def enemy_mask(self,world,enemy):
+        return self.enemy_masks[self.enemy_facing[world,enemy]][int(self.enemy_frameidx[world,enemy])]
+
+    def update_enemies(self,active,now):
+        if not self.enemy_alive.shape[1]:
+            return
+        updating=active[:,None]&self.enemy_alive
+        width,height=self.player_size
+        player_x=(self.x+width//2)[:,None]
+        player_y=(self.y+height//2)[:,None]
+        enemy_x=self.enemy_rects[:,0]+self.enemy_rects[:,2]//2
+        enemy_y=self.enemy_rects[:,1]+self.enemy_rects[:,3]//2
+
+        # Enemy.get_status and Entity.animate
+        self.enemy_facing=np.where(updating,np.where(player_x<enemy_x,0,1),self.enemy_facing)
+        self.enemy_frameidx[updating]+=7*self.dt
+        self.enemy_frameidx[updating&(self.enemy_frameidx>=self.enemy_frames[self.enemy_facing])]=0
+
+        # timers
+        self.enemy_can_shoot[updating&~self.enemy_can_shoot&(now-self.enemy_shoot_time>self.enemy_cooldown)]=True
+        self.enemy_vulnerable[updating&~self.enemy_vulnerable&(now-self.enemy_hit_time>self.invul_duration)]=True
+
+        # Enemy.check_fire, the distance is compared squared which is exact for whole pixels
+        top=self.enemy_rects[:,1]
+        bottom=top+self.enemy_rects[:,3]
+        close=(player_x-enemy_x)**2+(player_y-enemy_y)**2<600**2
+        fire=updating&close&(top-20<player_y)&(player_y<bottom+20)&self.enemy_can_shoot
+        side=np.where(self.enemy_facing==1,1,-1)
+        for enemy in np.flatnonzero(fire.any(axis=0)):
+            x=(enemy_x[enemy]+side[:,enemy]*80).astype(float)
+            y=np.full(self.count,float(enemy_y[enemy]-16))
+            self.spawn(fire[:,enemy],x,y,side[:,enemy],now)
+        self.enemy_can_shoot[fire]=False
+        self.enemy_shoot_time[fire]=now
+
+        self.enemy_alive[updating&(self.enemy_health<=0)]=False
+
+    # platforms
+    def platform_collisions(self,active):
+        width,height=self.player_size
+        for index,(x,_,platform_w,platform_h) in enumerate(self.platform_rects):
+            y=self.platform_y[:,index]
+            direction=self.platform_direction[:,index]
+            position=self.platform_position[:,index]
+            for border_x,border_y,border_w,border_h in self.platform_borders[index]:
+                hit=active&overlap(x,y,platform_w,platform_h,border_x,border_y,border_w,border_h)
+                up=hit&(direction<0)
+                down=hit&~(direction<0)
+                y[up]=border_y+border_h
+                y[down]=border_y-platform_h
+                direction[up]=1
+                direction[down]=-1
+                position[hit]=y[hit]+platform_h//2
+            below=active&overlap(x,y,platform_w,platform_h,self.x,self.y,width,height)&(self.y+height//2>y+platform_h//2)
+            y[below]=self.y[below]-platform_h
+            position[below]=y[below]+platform_h//2
+            direction[below]=-1
+
+    def move_platforms(self,active):
+        self.platform_old_y[active]=self.platform_y[active]
+        self.platform_position[active]+=self.platform_direction[active]*self.platform_speed*self.dt
+        height=self.platform_rects[:,3]
+        self.platform_y[active]=(np.rint(self.platform_position)-height//2)[active]
+
+    def state(self):
+        # the per world numbers validate compares against Game
+        return {
+            'x':self.x.copy(),'y':self.y.copy(),'health':self.health.copy(),'alive':self.alive.copy(),
+            'enemy_health':self.enemy_health.copy(),'enemy_alive':self.enemy_alive.copy(),
+            'platform_y':self.platform_y.copy(),'bullets':np.count_nonzero(self.bullet_alive,axis=1)
+        }
+
+def game_state(game,enemies):
+    return {
+        'x':game.player.rect.x,'y':game.player.rect.y,'health':game.player.health,'alive':game.player.alive(),
+        'enemy_health':[enemy.health for enemy in enemies],'enemy_alive':[enemy.alive() for enemy in enemies],
+        'platform_y':[platform.rect.y for platform in game.platform_sprites.sprites()],'bullets':len(game.bullets)
+    }
+
+def random_scripts(count,ticks,seed):
+    scripts=[]
+    for world in range(count):
+        controller=RandomController(seed+world)
+        scripts.append([controller.read() for _ in range(ticks)])
+    return scripts
+
+def validate(count,ticks,seed=0):
+    # runs the scripts through both engines and returns the first mismatch per world
+    from main import Game
+    scripts=random_scripts(count,ticks,seed)
+    batch=BatchSimulation(count,Game(headless=True,controller=IdleController()))
+    controls=np.array(scripts,dtype=bool)
+    history=[]
+    for tick in range(ticks):
+        batch.step(controls[:,tick])
+        history.append(batch.state())
+
+    mismatches={}
+    for world,script in enumerate(scripts):
+        game=Game(headless=True,controller=ScriptedController(script))
+        enemies=[sprite for sprite in game.vulnerable_sprites if sprite is not game.player]
+        for tick in range(ticks):
+            if not game.player.alive():
+                break
+            game.tick()
+            expected=game_state(game,enemies)
+            actual=history[tick]
+            difference=[key for key,value in expected.items() if np.any(np.asarray(value)!=actual[key][world])]
+            if difference:
+                mismatches[world]=(tick,difference)
+                break
+    return mismatches
+
+def benchmark(count,ticks,seed=0):
+    from main import Game
+    batch=BatchSimulation(count,Game(headless=True,controller=IdleController()))
+    controls=np.array(random_scripts(count,ticks,seed),dtype=bool)
+    start=time.perf_counter()
+    for tick in range(ticks):
+        batch.step(controls[:,tick])
+    elapsed=time.perf_counter()-start
+    rate=count*ticks/elapsed if elapsed else 0
+    print(f"Simulated {count} worlds for {ticks} ticks in {elapsed:.2f}s ({rate:.0f} world ticks/s), {np.count_nonzero(batch.alive)} players alive")
+    return rate
+
+if __name__=='__main__':
+    parser=argparse.ArgumentParser(description='vectorized Contra worlds')
+    parser.add_argument('--worlds',type=int,default=1000,help='worlds stepped together')
+    parser.add_argument('--ticks',type=int,default=1200,help='ticks to simulate')
+    parser.add_argument('--seed',type=int,default=0,help='seed of the first random controller')
+    parser.add_argument('--validate',action='store_true',help='compare against Game instead of timing')
+    args=parser.parse_args()
+    if args.validate:
+        mismatches=validate(args.worlds,args.ticks,args.seed)
+        for world,(tick,keys) in sorted(mismatches.items()):
+            print(f"world {world} diverges at tick {tick}: {', '.join(keys)}")
+        print(f"{args.worlds-len(mismatches)} of {args.worlds} worlds match Game for {args.ticks} ticks")
+    else:
+        benchmark(args.worlds,args.ticks,args.seed)
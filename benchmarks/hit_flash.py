@@ -0,0 +1,53 @@
+"""
+Per-frame cost of Entity.blink with many enemies flashing at once, using
+the cached silhouettes against rebuilding them from a mask every frame.
+Run from the repository root:
+
+    python -m benchmarks.hit_flash [enemy_count] [frames]
+"""
+
+import os
+import sys
+import time
+os.environ.setdefault('SDL_VIDEODRIVER','dummy')
+os.environ.setdefault('SDL_AUDIODRIVER','dummy')
+import pygame
+from entity import Entity
+from simulation import SimulationClock
+
+def rebuilt_blink(entity):
+    # Entity.blink before silhouettes were cached
+    if not entity.is_vulnerable:
+        if entity.wave_value():
+            mask=pygame.mask.from_surface(entity.image)
+            white_surface=mask.to_surface()
+            white_surface.set_colorkey((0,0,0))
+            entity.image=white_surface
+
+def cached_blink(entity):
+    entity.blink()
+
+def measure(blink,enemies,frames):
+    start=time.perf_counter()
+    for _ in range(frames):
+        for enemy in enemies:
+            enemy.animate(1/60)
+            blink(enemy)
+    return (time.perf_counter()-start)/frames*1000
+
+def main():
+    count=int(sys.argv[1]) if len(sys.argv)>1 else 500
+    frames=int(sys.argv[2]) if len(sys.argv)>2 else 100
+    pygame.init()
+    pygame.display.set_mode((1,1))
+    group=pygame.sprite.Group()
+    clock=SimulationClock(120)
+    enemies=[Entity((0,0),group,os.path.join('graphics','enemies'),None,clock) for _ in range(count)]
+    for enemy in enemies:
+        enemy.is_vulnerable=False
+        enemy.wave_value=lambda:True
+    print(f'{count} flashing enemies, {frames} frames')
+    print(f'  rebuilt {measure(rebuilt_blink,enemies,frames):.3f} ms/frame, cached {measure(cached_blink,enemies,frames):.3f} ms/frame')
+
+if __name__=='__main__':
+    main()
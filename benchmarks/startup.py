@@ -0,0 +1,49 @@
+"""
+Time from a fresh interpreter to a ready headless Game with the compiled
+level cache missing (pytmx parse plus compile) and present (memory-mapped
+load). Every run is its own process. Run from the repository root:
+
+    python -m benchmarks.startup [runs]
+"""
+
+import os
+import sys
+import shutil
+import subprocess
+from statistics import median
+from level import cache_path
+
+CHILD='''
+import os
+import time
+start=time.perf_counter()
+from main import Game
+from controllers import IdleController
+from level import load_level
+level_start=time.perf_counter()
+load_level(os.path.join('data','map.tmx'))
+level_time=time.perf_counter()-level_start
+Game(headless=True,controller=IdleController())
+print(time.perf_counter()-start,level_time)
+'''
+
+def measure():
+    # total start-up and the share spent loading the level, in ms
+    output=subprocess.run([sys.executable,'-c',CHILD],capture_output=True,text=True,check=True).stdout
+    total,level=output.split()[-2:]
+    return float(total)*1000,float(level)*1000
+
+def main():
+    runs=int(sys.argv[1]) if len(sys.argv)>1 else 5
+    folder=cache_path(os.path.join('data','map.tmx'))
+    cold=[]
+    for _ in range(runs):
+        shutil.rmtree(folder,ignore_errors=True)
+        cold.append(measure())
+    warm=[measure() for _ in range(runs)]
+    print(f'headless start-up, median of {runs} runs')
+    for name,times in (('cold',cold),('warm',warm)):
+        print(f'  {name} {median(total for total,_ in times):.1f} ms, level load {median(level for _,level in times):.1f} ms')
+
+if __name__=='__main__':
+    main()
@@ -0,0 +1,201 @@
+"""
+Hot path timings against the shipped map and against copies of it repeated
+side by side, with the SDL dummy drivers standing in for a window:
+Game set-up, Player.collision, Game.bullet_collisions at 10, 100 and 1000
+bullets, AllSprites.custom_draw and Entity.import_assets. Every number is
+the median milliseconds per call. Run from the repository root:
+
+    python -m benchmarks.suite run [--scales 1,4] [--repeat 20] [--save baseline.json]
+    python -m benchmarks.suite compare baseline.json [--results current.json] [--threshold 0.2]
+
+compare measures again (or reads --results) and exits with 1 when any metric
+got slower than its baseline by more than the threshold, or is missing from
+the new results without --allow-missing.
+"""
+
+import os
+import sys
+import json
+import shutil
+import argparse
+import random
+import time
+from statistics import median
+import xml.etree.ElementTree as ElementTree
+os.environ.setdefault('SDL_VIDEODRIVER','dummy')
+os.environ.setdefault('SDL_AUDIODRIVER','dummy')
+import numpy as np
+import pygame
+import assets
+import level
+from atlas import Atlas
+from main import Game
+from controllers import IdleController
+from settings import load_settings
+
+MAP=os.path.join('data','map.tmx')
+BULLETS=(10,100,1000)
+
+def scaled_map(scale):
+    # the map repeated scale times to the right, next to the original so relative paths still resolve
+    if scale==1:
+        return MAP
+    tree=ElementTree.parse(MAP)
+    root=tree.getroot()
+    width=int(root.get('width'))
+    shift=width*int(root.get('tilewidth'))
+    root.set('width',str(width*scale))
+    for layer in root.iter('layer'):
+        layer.set('width',str(width*scale))
+        data=layer.find('data')
+        rows=[row.strip().rstrip(',') for row in data.text.strip().split('\n')]
+        data.text='\n'+',\n'.join(','.join([row]*scale) for row in rows)+'\n'
+    next_id=int(root.get('nextobjectid'))
+    for group in root.iter('objectgroup'):
+        # one player is enough
+        objects=[obj for obj in group.findall('object') if obj.get('name')!='Player']
+        for copy in range(1,scale):
+            for obj in objects:
+                duplicate=ElementTree.SubElement(group,'object',dict(obj.attrib))
+                duplicate.set('id',str(next_id))
+                duplicate.set('x',str(float(obj.get('x'))+copy*shift))
+                next_id+=1
+    root.set('nextobjectid',str(next_id))
+    path=os.path.join('data',f'bench-x{scale}.tmx')
+    tree.write(path,encoding='UTF-8',xml_declaration=True)
+    return path
+
+def per_call(function,repeat,number=1,setup=None):
+    samples=[]
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start=time.perf_counter()
+        for _ in range(number):
+            function()
+        samples.append((time.perf_counter()-start)*1000/number)
+    return median(samples)
+
+def reload_level():
+    # every sample loads the level again, from the compiled cache, and packs it into a new atlas
+    # so no sample pays for the pages the ones before it filled
+    level.levels.clear()
+    assets.atlas=Atlas()
+
+def bullet_collisions(game,count,repeat,rng):
+    width=max(sprite.rect.right for sprite in game.collision_sprites)
+    height=max(sprite.rect.bottom for sprite in game.collision_sprites)
+    targets=[sprite.rect.center for sprite in game.vulnerable_sprites]
+    health={sprite:sprite.health for sprite in game.vulnerable_sprites}
+
+    def setup():
+        # a fresh volley each time, a quarter of it aimed at entities, and everyone back to full health
+        for index in np.flatnonzero(game.bullets.alive):
+            game.bullets.kill(index)
+        for sprite,value in health.items():
+            sprite.health=value
+            sprite.is_vulnerable=True
+        for _ in range(count):
+            position=rng.choice(targets) if rng.random()<.25 else (rng.uniform(0,width),rng.uniform(0,height))
+            game.bullets.spawn(position,pygame.math.Vector2(rng.choice((-1,1)),0),game.player)
+
+    return per_call(game.bullet_collisions,repeat,setup=setup)
+
+def run(scales,repeat):
+    pygame.display.set_mode((1,1))
+    rng=random.Random(0)
+    metrics={}
+    paths=[]
+    packed=assets.atlas
+    settings=load_settings()
+    texture_atlas=settings['texture_atlas']
+    try:
+        for scale in scales:
+            path=scaled_map(scale)
+            if path!=MAP:
+                paths.append(path)
+            # the first game compiles the level cache, set-up is timed loading from it
+            game=Game(controller=IdleController(),level=path)
+            metrics[f'setup x{scale}']=per_call(lambda:Game(controller=IdleController(),level=path),max(repeat//4,3),setup=reload_level)
+            assets.atlas=packed
+
+            player=game.player
+            player.old_rect=player.rect.copy()
+            metrics[f'player_collision x{scale}']=per_call(lambda:(player.collision('horizontal'),player.collision('vertical')),repeat,100)
+            for count in BULLETS:
+                metrics[f'bullet_collisions {count} x{scale}']=bullet_collisions(game,count,repeat,rng)
+            metrics[f'custom_draw x{scale}']=per_call(lambda:game.all_sprites.custom_draw(game.player),repeat,10)
+
+        # cold loads, the cache of loaded animations is emptied before each one. packing is left out,
+        # it would add the frames to the shared atlas again on every sample
+        settings['texture_atlas']=False
+        for name in ('player','enemies'):
+            path=os.path.join('graphics',name)
+            metrics[f'import_assets {name}']=per_call(lambda:game.player.import_assets(path),max(repeat//4,3),setup=assets.animations.clear)
+    finally:
+        settings['texture_atlas']=texture_atlas
+        assets.atlas=packed
+        # the scaled maps and the caches compiled from them
+        for path in paths:
+            shutil.rmtree(level.cache_path(path),ignore_errors=True)
+            os.remove(path)
+    return {'scales':scales,'repeat':repeat,'metrics':metrics}
+
+def compare(baseline,results,threshold,allow_missing=False):
+    # returns the metrics slower than baseline*(1+threshold), and the ones no longer measured
+    # unless allow_missing is set, so a renamed or crashed metric can't drop out unnoticed
+    regressions=[]
+    for name,before in baseline['metrics'].items():
+        after=results['metrics'].get(name)
+        if after is None:
+            print(f"  {name:<28} missing{'' if allow_missing else '  REGRESSION'}")
+            if not allow_missing:
+                regressions.append(name)
+            continue
+        change=after/before-1 if before else 0
+        regressed=change>threshold
+        if regressed:
+            regressions.append(name)
+        print(f"  {name:<28} {before:9.3f} -> {after:9.3f} ms {change:+7.1%}{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+def main():
+    parser=argparse.ArgumentParser(description='hot path benchmarks')
+    commands=parser.add_subparsers(dest='command',required=True)
+    run_parser=commands.add_parser('run',help='measure and print every metric')
+    run_parser.add_argument('--save',help='write the results to this JSON file')
+    compare_parser=commands.add_parser('compare',help='fail when a metric regressed against a baseline')
+    compare_parser.add_argument('baseline',help='JSON file written by run --save')
+    compare_parser.add_argument('--results',help='compare these saved results instead of measuring again')
+    compare_parser.add_argument('--threshold',type=float,default=.2,help='allowed slowdown, .2 is 20%%')
+    compare_parser.add_argument('--allow-missing',action='store_true',help='pass when baseline metrics were not measured')
+    for command in (run_parser,compare_parser):
+        command.add_argument('--scales',default='1,4',help='map sizes as multiples of data/map.tmx')
+        command.add_argument('--repeat',type=int,default=20,help='samples per metric, the median is kept')
+    args=parser.parse_args()
+    scales=[int(scale) for scale in args.scales.split(',')]
+
+    if args.command=='run':
+        results=run(scales,args.repeat)
+        for name,value in results['metrics'].items():
+            print(f'  {name:<28} {value:9.3f} ms')
+        if args.save:
+            with open(args.save,'w') as f:
+                json.dump(results,f,indent=4)
+        return
+
+    with open(args.baseline) as f:
+        baseline=json.load(f)
+    if args.results:
+        with open(args.results) as f:
+            results=json.load(f)
+    else:
+        results=run(scales,args.repeat)
+    regressions=compare(baseline,results,args.threshold,args.allow_missing)
+    if regressions:
+        print(f'{len(regressions)} metric(s) regressed by more than {args.threshold:.0%} or missing')
+        sys.exit(1)
+    print(f'no metric regressed by more than {args.threshold:.0%}')
+
+if __name__=='__main__':
+    main()
@@ -1,35 +1,120 @@
 import pygame
 import os
+import numpy as np
+from functools import partial
 from pygame.math import Vector2 as vector
+from groups import relocate
+from assets import atlas,pack
 
-class Bullet(pygame.sprite.Sprite):
-    def __init__(self,position,surface,direction,group,settings):
-        super().__init__(group)
-        self.image=surface
-        if direction.x<0:
-            self.image=pygame.transform.flip(surface, True, False)
-        self.rect=self.image.get_rect(center=position)
-        self.z=settings['layers']['Level']
-        self.mask=pygame.mask.from_surface(self.image)
-        self.start_time=pygame.time.get_ticks()
+class DirectionalSprites:
+    def __init__(self,surface,fire_frames):
+        # left facing variants are flipped once here instead of on every shot
+        flipped=pygame.transform.flip(surface,True,False)
+        surface,flipped=pack((surface,flipped))
+        self.surfaces={1:surface,-1:flipped}
+        self.masks={1:pygame.mask.from_surface(surface),-1:pygame.mask.from_surface(flipped)}
+        self.fire_frames={
+            1:pack(fire_frames),
+            -1:pack(pygame.transform.flip(frame,True,False) for frame in fire_frames)
+        }
+
+    def side(self,direction):
+        return -1 if direction.x<0 else 1
 
-        # position
-        self.position=vector(self.rect.center)
-        self.direction=direction
+class BulletPool:
+    def __init__(self,sprites,settings,clock,capacity=64):
+        self.sprites=sprites
+        self.clock=clock
+        self.z=settings['layers']['Level']
+        self.width,self.height=sprites.surfaces[1].get_size()
         self.speed=2000
+        self.lifetime=1000
 
-    def move(self,dt):
-        self.position+=self.direction*self.speed*dt
-        self.rect.center=(round(self.position.x),round(self.position.y))
-        
+        # one slot per bullet, freed slots are handed out again
+        self.positions=np.zeros((capacity,2))
+        self.previous=np.zeros((capacity,2))
+        self.directions=np.zeros((capacity,2))
+        self.timers=[None]*capacity
+        self.alive=np.zeros(capacity,dtype=bool)
+        self.owners=[None]*capacity
+        self.free=list(range(capacity-1,-1,-1))
+
+    def __len__(self):
+        return int(np.count_nonzero(self.alive))
+
+    def grow(self):
+        capacity=len(self.alive)
+        self.positions=np.concatenate((self.positions,np.zeros((capacity,2))))
+        self.previous=np.concatenate((self.previous,np.zeros((capacity,2))))
+        self.directions=np.concatenate((self.directions,np.zeros((capacity,2))))
+        self.timers.extend([None]*capacity)
+        self.alive=np.concatenate((self.alive,np.zeros(capacity,dtype=bool)))
+        self.owners.extend([None]*capacity)
+        self.free.extend(range(2*capacity-1,capacity-1,-1))
+
+    def spawn(self,position,direction,owner):
+        if not self.free:
+            self.grow()
+        index=self.free.pop()
+        # the starting position snaps to the pixel grid like a sprite rect would
+        self.positions[index]=self.sprites.surfaces[1].get_rect(center=position).center
+        self.previous[index]=self.positions[index]
+        self.directions[index]=direction
+        self.timers[index]=self.clock.schedule(self.lifetime,partial(self.kill,index))
+        self.alive[index]=True
+        self.owners[index]=owner
+
+    def kill(self,index):
+        if self.alive[index]:
+            self.alive[index]=False
+            self.owners[index]=None
+            self.clock.cancel(self.timers[index])
+            self.timers[index]=None
+            self.free.append(index)
 
     def update(self,dt):
-        self.move(dt)
-        if pygame.time.get_ticks()-self.start_time>1000:
-            self.kill()
+        alive=self.alive
+        self.positions[alive]+=self.directions[alive]*self.speed*dt
+
+    def snapshot(self):
+        self.previous[:]=self.positions
+
+    def topleft(self,indices,positions=None):
+        positions=self.positions if positions is None else positions
+        return np.rint(positions[indices]).astype(int)-(self.width//2,self.height//2)
+
+    def side(self,index):
+        return -1 if self.directions[index,0]<0 else 1
+
+    def overlapping(self,rect):
+        indices=np.flatnonzero(self.alive)
+        topleft=self.topleft(indices)
+        near=(
+            (topleft[:,0]<rect.right)&(topleft[:,0]+self.width>rect.left)&
+            (topleft[:,1]<rect.bottom)&(topleft[:,1]+self.height>rect.top)
+        )
+        return indices[near],topleft[near]
+
+    def rects(self):
+        indices=np.flatnonzero(self.alive)
+        for index,(x,y) in zip(indices,self.topleft(indices)):
+            yield index,pygame.Rect(x,y,self.width,self.height)
+
+    def mask(self,index):
+        return self.sprites.masks[self.side(index)]
+
+    def draw(self,surface,offset,view,alpha=1):
+        indices,topleft=self.overlapping(view)
+        # blend towards the state of the last tick
+        previous=self.topleft(indices,self.previous)
+        topleft=previous+(topleft-previous)*alpha
+        images=[self.sprites.surfaces[self.side(index)] for index in indices]
+        sources=[atlas.source(image) for image in images]
+        rects=surface.blits((page,(x-offset.x,y-offset.y),area) for (page,area),(x,y) in zip(sources,topleft))
+        return zip(((self,index) for index in indices),rects,images)
 
 class FireAnimation(pygame.sprite.Sprite):
-    def __init__(self,position,direction,surface_list,group,settings,entity):
+    def __init__(self,position,direction,sprites,group,settings,entity):
         super().__init__(group)
         # offset
         xoffset=60 if direction.x>0 else -60
@@ -37,7 +122,7 @@ class FireAnimation(pygame.sprite.Sprite):
         self.offset=vector(xoffset,yoffset)
 
         self.entity=entity
-        self.frames=[pygame.transform.flip(surface,True,False) if direction.x<0 else surface for surface in surface_list]
+        self.frames=sprites.fire_frames[sprites.side(direction)]
         self.frameidx=0
         self.image=self.frames[self.frameidx]
         self.rect=self.image.get_rect(center=self.entity.rect.center+self.offset)
@@ -52,6 +137,7 @@ class FireAnimation(pygame.sprite.Sprite):
 
     def move(self,dt):
         self.rect.center=self.entity.rect.center+self.offset
+        relocate(self)
 
     def update(self,dt):
         self.animate(dt)
@@ -0,0 +1,40 @@
+import pygame
+
+class ChunkLayer:
+    def __init__(self,chunk_size):
+        self.chunk_size=chunk_size
+        self.chunks={}
+
+    def get_chunk(self,cx,cy):
+        if (cx,cy) not in self.chunks:
+            chunk=pygame.Surface((self.chunk_size,self.chunk_size),pygame.SRCALPHA)
+            if pygame.display.get_surface():
+                chunk=chunk.convert_alpha()
+            self.chunks[(cx,cy)]=chunk
+        return self.chunks[(cx,cy)]
+
+    def bake(self,tiles):
+        # tiles straddling a chunk border are blitted into every chunk they touch
+        baked=set()
+        for position,surface in tiles:
+            rect=surface.get_rect(topleft=position)
+            for cx in range(rect.left//self.chunk_size,(rect.right-1)//self.chunk_size+1):
+                for cy in range(rect.top//self.chunk_size,(rect.bottom-1)//self.chunk_size+1):
+                    chunk=self.get_chunk(cx,cy)
+                    chunk.blit(surface,(rect.x-cx*self.chunk_size,rect.y-cy*self.chunk_size))
+                    baked.add((cx,cy))
+
+        # tilesets are mostly fully transparent, run-length encoding skips those pixels when blitting
+        for key in baked:
+            self.chunks[key].set_alpha(255,pygame.RLEACCEL)
+
+    def draw(self,surface,offset):
+        left=int(offset.x)//self.chunk_size
+        top=int(offset.y)//self.chunk_size
+        right=(int(offset.x)+surface.get_width())//self.chunk_size
+        bottom=(int(offset.y)+surface.get_height())//self.chunk_size
+        for cx in range(left,right+1):
+            for cy in range(top,bottom+1):
+                chunk=self.chunks.get((cx,cy))
+                if chunk:
+                    surface.blit(chunk,(cx*self.chunk_size-offset.x,cy*self.chunk_size-offset.y))
@@ -0,0 +1,47 @@
+import random
+from collections import namedtuple
+import pygame
+
+Controls=namedtuple('Controls',['left','right','jump','duck','shoot'])
+
+IDLE=Controls(False,False,False,False,False)
+
+class KeyboardController:
+    def read(self):
+        keys=pygame.key.get_pressed()
+        return Controls(
+            left=keys[pygame.K_LEFT] or keys[pygame.K_a],
+            right=keys[pygame.K_RIGHT] or keys[pygame.K_d],
+            jump=keys[pygame.K_UP] or keys[pygame.K_w],
+            duck=keys[pygame.K_DOWN] or keys[pygame.K_s] or keys[pygame.K_LCTRL],
+            shoot=keys[pygame.K_SPACE]
+        )
+
+class IdleController:
+    def read(self):
+        return IDLE
+
+class ScriptedController:
+    # one Controls per tick, idle once the script runs out
+    def __init__(self,script):
+        self.script=list(script)
+        self.tick=0
+
+    def read(self):
+        controls=self.script[self.tick] if self.tick<len(self.script) else IDLE
+        self.tick+=1
+        return controls
+
+class RandomController:
+    # holds a random button combination for a few ticks, like a button-mashing player
+    def __init__(self,seed=None,hold=20):
+        self.random=random.Random(seed)
+        self.hold=hold
+        self.tick=0
+        self.controls=IDLE
+
+    def read(self):
+        if self.tick%self.hold==0:
+            self.controls=Controls(*(self.random.random()<0.4 for _ in Controls._fields))
+        self.tick+=1
+        return self.controls
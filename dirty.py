@@ -0,0 +1,38 @@
+import pygame
+
+class DirtyRects:
+    def __init__(self):
+        self.previous={}
+        self.current={}
+        self.offset=None
+        self.full=True
+
+    def camera(self,offset):
+        # a scrolling camera moves every pixel of the frame
+        if offset!=self.offset:
+            self.full=True
+            self.offset=offset.copy()
+
+    def track(self,key,rect,state):
+        self.current[key]=(rect,state)
+
+    def rects(self):
+        rects=[]
+        for key,(rect,state) in self.current.items():
+            previous=self.previous.pop(key,None)
+            if previous!=(rect,state):
+                rects.append(rect)
+                if previous:
+                    rects.append(previous[0])
+        # whatever was drawn last frame and not this one has to be cleared
+        rects.extend(rect for rect,state in self.previous.values())
+        return rects
+
+    def update(self):
+        if self.full:
+            pygame.display.update()
+        else:
+            pygame.display.update(self.rects())
+        self.previous=self.current
+        self.current={}
+        self.full=False
@@ -4,16 +4,31 @@ from entity import Entity
 import json
 from pygame.math import Vector2 as vector
 
+def cycle_length(frames,step):
+    # ticks from frame 0 until the animation starts over
+    frameidx=0
+    ticks=0
+    while frameidx<frames:
+        frameidx+=step
+        ticks+=1
+    return ticks
+
 class Enemy(Entity):
-    def __init__(self, position, group, path, shoot,player,collision_sprites):
-        super().__init__(position, group, path, shoot)
+    def __init__(self, position, group, path, shoot,player,collision_sprites,clock):
+        super().__init__(position, group, path, shoot, clock)
         self.player=player
-        for sprite in collision_sprites.sprites():
+        # snapping up to a tile top can land the point in the tile above
+        for sprite in collision_sprites.near(pygame.Rect(self.rect.midbottom,(1,1)).inflate(0,128)):
             if sprite.rect.collidepoint(self.rect.midbottom):
                 self.rect.bottom=sprite.rect.top
         self.shoot=shoot
         self.cooldown=800
         self.health=3
+
+        # set by the activation region, synced is the first tick the animation has not played yet
+        self.region=None
+        self.dormant=False
+        self.synced=0
     
     def get_status(self):
         if self.player.rect.centerx<self.rect.centerx:
@@ -31,18 +46,51 @@ class Enemy(Entity):
             y_offset=vector(0,-16)
             position=self.rect.center+bullet_direction*80
             self.shoot(position+y_offset,bullet_direction,self)
-            self.bullet_sound.play()
+            self.bullet_sound.play(self.rect.center)
             self.can_shoot=False
-            self.shoot_time=pygame.time.get_ticks()
+            self.clock.schedule(self.cooldown,self.reload)
     
+    def can_sleep(self):
+        # a hit enemy stays awake until its invulnerability ends or it dies
+        return self.is_vulnerable and self.health>0
+
+    def fall_asleep(self):
+        self.dormant=True
+        self.synced=self.clock.ticks
+
+    def wake_up(self):
+        self.catch_up(self.clock.ticks)
+        self.dormant=False
+
+    def catch_up(self,ticks):
+        # replays the animation of the ticks slept through, so the mask is the one of an enemy that never slept.
+        # every cycle after the first starts from 0 and lasts as many ticks, so whole cycles are skipped
+        if self.synced<ticks:
+            self.get_status()
+            frames=len(self.animations[self.status])
+            step=7*self.clock.step
+            remaining=ticks-self.synced
+            while remaining:
+                remaining-=1
+                self.frameidx+=step
+                if self.frameidx>=frames:
+                    self.frameidx=0
+                    break
+            for _ in range(remaining%cycle_length(frames,step)):
+                self.frameidx+=step
+            self.synced=ticks
+            self.image=self.animations[self.status][int(self.frameidx)]
+            self.mask=self.masks[self.status][int(self.frameidx)]
+
+    def damage(self):
+        super().damage()
+        if self.dormant:
+            self.region.wake(self)
+
     def update(self,dt):
         self.get_status()
         self.animate(dt)
         self.blink()
-
-        # timers
-        self.shoot_timer()
-        self.invul_timer()
         self.check_fire()
 
         # death check
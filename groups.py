@@ -0,0 +1,109 @@
+from itertools import count
+import pygame
+from spatial import SpatialGrid
+
+class LayeredGroup(pygame.sprite.Group):
+    def __init__(self,layers,cell_size=64):
+        super().__init__()
+        self.cell_size=cell_size
+        self.buckets={z:SpatialGrid(cell_size) for z in sorted(set(layers.values()))}
+        self.bucket_of={}
+        self.pending={}
+        self.dynamic={}
+        # flush order, sleeping sprites rejoin the update at their old place
+        self.sequence={}
+        self.counter=count()
+
+    def add_internal(self,sprite,layer=None):
+        super().add_internal(sprite,layer)
+        # sprites join their group before setting z and rect, so bucketing waits for the next flush
+        self.pending[sprite]=None
+
+    def remove_internal(self,sprite):
+        super().remove_internal(sprite)
+        if sprite in self.pending:
+            del self.pending[sprite]
+        else:
+            self.buckets[self.bucket_of.pop(sprite)].remove(sprite)
+            self.dynamic.pop(sprite,None)
+            del self.sequence[sprite]
+
+    def relocate(self,sprite):
+        if sprite in self.bucket_of:
+            self.buckets[self.bucket_of[sprite]].relocate(sprite)
+
+    def bucket(self,z):
+        if z not in self.buckets:
+            self.buckets[z]=SpatialGrid(self.cell_size)
+            self.buckets=dict(sorted(self.buckets.items()))
+        return self.buckets[z]
+
+    def flush(self):
+        for sprite in self.pending:
+            self.bucket(sprite.z).insert(sprite)
+            self.bucket_of[sprite]=sprite.z
+            self.sequence[sprite]=next(self.counter)
+            if not getattr(sprite,'static',False):
+                self.dynamic[sprite]=None
+        self.pending.clear()
+
+    def sleep(self,sprite):
+        # still drawn and collided with, only left out of update
+        self.flush()
+        self.dynamic.pop(sprite,None)
+
+    def wake(self,sprite):
+        self.flush()
+        if sprite in self.sequence and sprite not in self.dynamic:
+            self.dynamic[sprite]=None
+            self.dynamic=dict.fromkeys(sorted(self.dynamic,key=self.sequence.__getitem__))
+
+    def update(self,*args,**kwargs):
+        # static tiles have nothing to update
+        self.flush()
+        for sprite in list(self.dynamic):
+            sprite.update(*args,**kwargs)
+
+    def layers(self,rect=None):
+        self.flush()
+        for z,bucket in self.buckets.items():
+            yield z,bucket if rect is None else bucket.query(rect)
+
+    def layered(self,rect=None):
+        for z,sprites in self.layers(rect):
+            yield from sprites
+
+class GridGroup(pygame.sprite.Group):
+    def __init__(self,cell_size=64):
+        super().__init__()
+        self.grid=SpatialGrid(cell_size)
+        self.pending={}
+
+    def add_internal(self,sprite,layer=None):
+        super().add_internal(sprite,layer)
+        self.pending[sprite]=None
+
+    def remove_internal(self,sprite):
+        super().remove_internal(sprite)
+        if sprite in self.pending:
+            del self.pending[sprite]
+        else:
+            self.grid.remove(sprite)
+
+    def relocate(self,sprite):
+        if sprite in self.grid.spans:
+            self.grid.relocate(sprite)
+
+    def flush(self):
+        for sprite in self.pending:
+            self.grid.insert(sprite)
+        self.pending.clear()
+
+    def near(self,rect):
+        self.flush()
+        return self.grid.query(rect)
+
+def relocate(sprite):
+    for group in sprite.groups():
+        if isinstance(group,(LayeredGroup,GridGroup)):
+            group.relocate(sprite)
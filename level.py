@@ -0,0 +1,230 @@
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+import xml.etree.ElementTree as ElementTree
+import numpy as np
+import pygame
+from pytmx import TiledMap,TiledTileLayer,TiledObjectGroup,TiledImageLayer
+from pytmx.util_pygame import load_pygame,handle_transformation,smart_convert
+from settings import load_settings
+from assets import pack
+
+CACHE_DIR=os.path.join('data','.cache')
+# bumped whenever the layout of a compiled level changes, older caches are compiled again
+CACHE_VERSION=2
+
+def headless_image_loader(filename,colorkey,**kwargs):
+    # pytmx's pygame loader without the display conversion, which needs a window
+    image=pygame.image.load(filename)
+
+    def load_image(rect=None,flags=None):
+        tile=image.subsurface(rect) if rect else image.copy()
+        if flags:
+            tile=handle_transformation(tile,flags)
+        if colorkey:
+            tile.set_colorkey(pygame.Color(f'#{colorkey}'))
+        return tile
+
+    return load_image
+
+class CompiledTileLayer:
+    def __init__(self,name,data,images):
+        self.name=name
+        self.data=data
+        self.height,self.width=data.shape
+        self.images=images
+
+    def tiles(self):
+        # row-major like TiledTileLayer.tiles
+        rows,columns=np.nonzero(self.data>=0)
+        for y,x in zip(rows.tolist(),columns.tolist()):
+            yield x,y,self.images[self.data[y,x]]
+
+class CompiledObject:
+    def __init__(self,name,type,x,y,width,height,image):
+        self.name=name
+        self.type=type
+        self.x=x
+        self.y=y
+        self.width=width
+        self.height=height
+        self.image=image
+
+class CompiledObjectLayer(list):
+    def __init__(self,name,objects):
+        super().__init__(objects)
+        self.name=name
+
+class CompiledImageLayer:
+    def __init__(self,name,source,offsetx,offsety,parallaxx,parallaxy):
+        self.name=name
+        self.source=source
+        self.offsetx=offsetx
+        self.offsety=offsety
+        self.parallaxx=parallaxx
+        self.parallaxy=parallaxy
+
+class CompiledLevel:
+    # the parts of a TiledMap the game reads, rebuilt from the level cache
+    def __init__(self,filename,info,grids,pixels):
+        self.filename=filename
+        self.width=info['width']
+        self.height=info['height']
+        self.tilewidth=info['tilewidth']
+        self.tileheight=info['tileheight']
+        self.images=list(pack(image_from_pixels(pixels,*entry) for entry in info['images']))
+        self.layers=[]
+        for layer in info['layers']:
+            if layer['kind']=='tiles':
+                self.layers.append(CompiledTileLayer(layer['name'],grids[layer['index']],self.images))
+            elif layer['kind']=='objects':
+                objects=[CompiledObject(**dict(obj,image=None if obj['image'] is None else self.images[obj['image']])) for obj in layer['objects']]
+                self.layers.append(CompiledObjectLayer(layer['name'],objects))
+            else:
+                self.layers.append(CompiledImageLayer(**{key:value for key,value in layer.items() if key!='kind'}))
+
+    def get_layer_by_name(self,name):
+        for layer in self.layers:
+            if layer.name==name:
+                return layer
+        raise ValueError(f'Layer "{name}" not found')
+
+def image_from_pixels(pixels,offset,width,height,colorkey):
+    surface=pygame.image.frombytes(pixels[offset:offset+width*height*4].tobytes(),(width,height),'RGBA')
+    # the conversion load_pygame gives every tile
+    return smart_convert(surface,colorkey,True) if pygame.display.get_surface() else surface
+
+def source_files(path):
+    # the map, its external tilesets and every image they point at
+    files=[path]
+    folder=os.path.dirname(path)
+    root=ElementTree.parse(path).getroot()
+    for image in root.iter('image'):
+        files.append(os.path.join(folder,image.get('source')))
+    for tileset in root.iter('tileset'):
+        if tileset.get('source'):
+            tileset_path=os.path.join(folder,tileset.get('source'))
+            files.append(tileset_path)
+            for image in ElementTree.parse(tileset_path).getroot().iter('image'):
+                files.append(os.path.join(os.path.dirname(tileset_path),image.get('source')))
+    return files
+
+def source_hash(path):
+    digest=hashlib.sha1(str(CACHE_VERSION).encode())
+    for file in source_files(path):
+        with open(file,'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+def cache_path(path):
+    return os.path.join(CACHE_DIR,f'{os.path.splitext(os.path.basename(path))[0]}-{source_hash(path)}')
+
+def compile_level(tmx_map,folder):
+    # tile layers become one grid of image indices each, every image used by a layer or an object
+    # is stored once as RGBA pixels. tmx_map has to come from headless_image_loader, converted
+    # surfaces can drop their alpha
+    images={}
+    chunks=[]
+    offset=0
+
+    def image_index(gid):
+        nonlocal offset
+        if gid not in images:
+            surface=tmx_map.images[gid]
+            width,height=surface.get_size()
+            colorkey=surface.get_colorkey()
+            chunks.append(np.frombuffer(pygame.image.tobytes(surface,'RGBA'),dtype=np.uint8))
+            images[gid]=(len(images),(offset,width,height,list(colorkey) if colorkey else None))
+            offset+=width*height*4
+        return images[gid][0]
+
+    grids=[]
+    layers=[]
+    for layer in tmx_map.layers:
+        if isinstance(layer,TiledTileLayer):
+            grid=np.full((layer.height,layer.width),-1,dtype=np.int32)
+            for x,y,gid in layer.iter_data():
+                if gid and tmx_map.images[gid]:
+                    grid[y,x]=image_index(gid)
+            layers.append({'kind':'tiles','name':layer.name,'index':len(grids)})
+            grids.append(grid)
+        elif isinstance(layer,TiledObjectGroup):
+            objects=[{
+                'name':obj.name,'type':obj.type,'x':obj.x,'y':obj.y,'width':obj.width,'height':obj.height,
+                'image':image_index(obj.gid) if obj.gid and obj.image else None
+            } for obj in layer]
+            layers.append({'kind':'objects','name':layer.name,'objects':objects})
+        elif isinstance(layer,TiledImageLayer):
+            layers.append({
+                'kind':'image','name':layer.name,'source':layer.source,
+                'offsetx':getattr(layer,'offsetx',0),'offsety':getattr(layer,'offsety',0),
+                'parallaxx':getattr(layer,'parallaxx',1),'parallaxy':getattr(layer,'parallaxy',1)
+            })
+    info={
+        'version':CACHE_VERSION,
+        'width':tmx_map.width,'height':tmx_map.height,'tilewidth':tmx_map.tilewidth,'tileheight':tmx_map.tileheight,
+        'images':[entry for _,entry in sorted(images.values())],'layers':layers
+    }
+
+    # written next to the final folder and renamed, so parallel workers never read half a cache
+    os.makedirs(os.path.dirname(folder),exist_ok=True)
+    temporary=tempfile.mkdtemp(dir=os.path.dirname(folder))
+    np.save(os.path.join(temporary,'grids.npy'),np.stack(grids) if grids else np.zeros((0,0,0),dtype=np.int32))
+    np.save(os.path.join(temporary,'pixels.npy'),np.concatenate(chunks) if chunks else np.zeros(0,dtype=np.uint8))
+    with open(os.path.join(temporary,'level.json'),'w') as f:
+        json.dump(info,f)
+    try:
+        os.rename(temporary,folder)
+    except OSError:
+        shutil.rmtree(temporary)
+
+def load_compiled(path,folder):
+    with open(os.path.join(folder,'level.json')) as f:
+        info=json.load(f)
+    if info.get('version')!=CACHE_VERSION:
+        raise ValueError(f'{folder} was compiled by another version')
+    grids=np.load(os.path.join(folder,'grids.npy'),mmap_mode='r')
+    pixels=np.load(os.path.join(folder,'pixels.npy'),mmap_mode='r')
+    return CompiledLevel(path,info,grids,pixels)
+
+def pack_level(tmx_map):
+    # only the images a layer or an object uses
+    gids=set()
+    for layer in tmx_map.layers:
+        if isinstance(layer,TiledTileLayer):
+            gids.update(gid for _,_,gid in layer.iter_data() if gid and tmx_map.images[gid])
+        elif isinstance(layer,TiledObjectGroup):
+            gids.update(obj.gid for obj in layer if obj.gid and obj.image)
+    gids=sorted(gids)
+    for gid,surface in zip(gids,pack(tmx_map.images[gid] for gid in gids)):
+        tmx_map.images[gid]=surface
+    return tmx_map
+
+def parse_level(path):
+    if pygame.display.get_surface():
+        return pack_level(load_pygame(path))
+    return TiledMap(path,image_loader=headless_image_loader)
+
+levels={}
+
+def load_level(path):
+    # parsed once per process, the map is only read from afterwards
+    key=(path,bool(pygame.display.get_surface()))
+    if key not in levels:
+        levels[key]=load_cached(path) if load_settings()['level_cache'] else parse_level(path)
+    return levels[key]
+
+def load_cached(path):
+    # a missing, stale or broken cache is compiled again, pytmx is the last resort
+    folder=cache_path(path)
+    try:
+        return load_compiled(path,folder)
+    except (OSError,ValueError,KeyError,TypeError):
+        shutil.rmtree(folder,ignore_errors=True)
+    try:
+        compile_level(TiledMap(path,image_loader=headless_image_loader),folder)
+        return load_compiled(path,folder)
+    except (OSError,ValueError,KeyError,TypeError):
+        return parse_level(path)
@@ -1,80 +1,176 @@
 import os
 import sys
+import time
+import argparse
 from pygame.math import Vector2 as vector
-import json
-from pytmx.util_pygame import load_pygame
 from overlay import Overlay
+from music import Music
+from profiler import Profiler
 import pygame
 from tile import Tile,CollisionTile,MovingPlatform
 from player import Player
-from bullet import Bullet,FireAnimation
+from bullet import BulletPool,FireAnimation,DirectionalSprites
 from enemy import Enemy
+from groups import LayeredGroup,GridGroup,relocate
+from chunks import ChunkLayer
+from parallax import load_parallax_layers
+from dirty import DirtyRects
+from tilegrid import TileGrid,TileGridGroup
+from simulation import SimulationClock
+from controllers import KeyboardController,IdleController,RandomController
+from assets import load_image,atlas,sounds
+from level import load_level
+from activation import ActivationRegion
+from settings import load_settings
 
-class AllSprites(pygame.sprite.Group):
-    def __init__(self,settings):
-        super().__init__()
+class AllSprites(LayeredGroup):
+    def __init__(self,settings,dirty_rects=None,level=os.path.join('data','map.tmx')):
+        super().__init__(settings['layers'])
         self.display_surface=pygame.display.get_surface()
         self.offset=vector()
         self.settings=settings
+        self.dirty_rects=dirty_rects
+        self.view_rect=pygame.Rect(0,0,settings['window_width'],settings['window_height']).inflate(2*settings['cull_margin'],2*settings['cull_margin'])
 
         # sky
-        self.fg_sky=pygame.image.load(os.path.join('graphics','sky','fg_sky.png')).convert_alpha()
-        self.bg_sky=pygame.image.load(os.path.join('graphics','sky','bg_sky.png')).convert_alpha()
-        tmx_map=load_pygame(os.path.join('data','map.tmx'))
-        self.padding=self.settings['window_width']/2
-        self.sky_width=self.bg_sky.get_width()
-        map_width=tmx_map.tilewidth*tmx_map.width+2*self.padding
-        self.sky_num=int(map_width//self.sky_width)
-        
-
-    def custom_draw(self,player):
-        self.offset.x=player.rect.centerx-self.settings['window_width']/2
-        self.offset.y=player.rect.centery-self.settings['window_height']/2
-        for x in range(self.sky_num):
-            xpos=-self.padding+x*self.sky_width
-            self.display_surface.blit(self.bg_sky,(xpos-self.offset.x/2.5,800-self.offset.y/2.5))
-            self.display_surface.blit(self.fg_sky,(xpos-self.offset.x/2,800-self.offset.y/2))
-        for sprite in sorted(self.sprites(),key=lambda sprite:sprite.z):
-            self.display_surface.blit(sprite.image,sprite.rect.topleft-self.offset)
+        self.parallax_layers=[]
+        if self.display_surface:
+            self.parallax_layers=load_parallax_layers(load_level(level))
+
+        # baked static layers
+        self.bg_layers=[]
+        self.fg_layers=[]
+
+        # batches drawn in one go after the sprites sharing their z
+        self.batches={}
+
+        # positions at the start of the current tick, drawing blends from them
+        self.previous={}
+
+    def add_batch(self,batch):
+        self.bucket(batch.z)
+        self.batches.setdefault(batch.z,[]).append(batch)
+
+    def snapshot(self):
+        self.flush()
+        self.previous={sprite:sprite.rect.topleft for sprite in self.dynamic}
+        for batches in self.batches.values():
+            for batch in batches:
+                batch.snapshot()
+
+    def interpolate(self,sprite,alpha):
+        x,y=sprite.rect.topleft
+        previous_x,previous_y=self.previous.get(sprite,(x,y))
+        return vector(previous_x+(x-previous_x)*alpha,previous_y+(y-previous_y)*alpha)
+
+    def bake(self,map_tmx):
+        # layers up to Level are drawn below the dynamic sprites, the rest above them
+        background=ChunkLayer(self.settings['chunk_size'])
+        foreground=ChunkLayer(self.settings['chunk_size'])
+        for name,z in sorted(self.settings['layers'].items(),key=lambda item:item[1]):
+            layer=foreground if z>self.settings['layers']['Level'] else background
+            layer.bake(((x*map_tmx.tilewidth,y*map_tmx.tileheight),surface) for x,y,surface in map_tmx.get_layer_by_name(name).tiles())
+        self.bg_layers=[background]
+        self.fg_layers=[foreground]
+
+    def custom_draw(self,player,alpha=1):
+        position=self.interpolate(player,alpha)
+        # whole pixels, blits truncate towards zero so a fractional camera shifts negative positions only
+        self.offset.x=round(position.x+player.rect.width//2-self.settings['window_width']/2)
+        self.offset.y=round(position.y+player.rect.height//2-self.settings['window_height']/2)
+        if self.dirty_rects:
+            self.dirty_rects.camera(self.offset)
+        for layer in self.parallax_layers:
+            layer.draw(self.display_surface,self.offset)
+        for layer in self.bg_layers:
+            layer.draw(self.display_surface,self.offset)
+        self.view_rect.center=player.rect.center
+        for z,sprites in self.layers(self.view_rect):
+            # packed images are blitted from their atlas page, one call per layer
+            sprites=list(sprites)
+            sources=[atlas.source(sprite.image) for sprite in sprites]
+            rects=self.display_surface.blits([(page,self.interpolate(sprite,alpha)-self.offset,area) for sprite,(page,area) in zip(sprites,sources)])
+            if self.dirty_rects:
+                for sprite,rect in zip(sprites,rects):
+                    self.dirty_rects.track(sprite,rect,sprite.image)
+            for batch in self.batches.get(z,()):
+                for key,rect,image in batch.draw(self.display_surface,self.offset,self.view_rect,alpha):
+                    if self.dirty_rects:
+                        self.dirty_rects.track(key,rect,image)
+        for layer in self.fg_layers:
+            layer.draw(self.display_surface,self.offset)
 
 class Game:
-    def __init__(self):
-        pygame.init()
-        f=open('settings.json')
-        self.settings=json.load(f)
-        del f
-        self.display_surface=pygame.display.set_mode((self.settings['window_width'],self.settings['window_height']))
-        pygame.display.set_caption('Contra')
+    def __init__(self,headless=False,controller=None,level=os.path.join('data','map.tmx')):
+        self.settings=load_settings()
+        self.level=level
+        self.headless=headless
+        # the keyboard needs a window, headless games stand still unless given a controller
+        self.controller=controller or (IdleController() if headless else KeyboardController())
+        if headless:
+            # no window, no mixer, nothing converted or drawn
+            self.display_surface=None
+        else:
+            pygame.init()
+            self.display_surface=pygame.display.set_mode((self.settings['window_width'],self.settings['window_height']))
+            pygame.display.set_caption('Contra')
+            sounds.setup(self.settings['sound_channels'],self.settings['window_width'],self.settings['window_height'])
         self.clock=pygame.time.Clock()
+        self.sim_clock=SimulationClock(self.settings['tick_rate'])
+        self.accumulator=0
+        self.profiler=Profiler(self.settings['profiler']['window'],self.settings['profiler']['enabled'])
+
+        self.dirty_rects=DirtyRects() if self.settings['dirty_rects'] else None
 
         # groups
-        self.all_sprites=AllSprites(self.settings)
-        self.collision_sprites=pygame.sprite.Group()
+        self.all_sprites=AllSprites(self.settings,self.dirty_rects,level)
+        self.collision_sprites=GridGroup()
         self.platform_sprites=pygame.sprite.Group()
-        self.bullet_sprites=pygame.sprite.Group()
-        self.vulnerable_sprites=pygame.sprite.Group()
+        self.vulnerable_sprites=GridGroup()
+
+        # enemies far from the player sleep
+        self.activation=ActivationRegion(self.all_sprites,self.settings['activation_radius'])
 
         # bullet surface
-        self.bullet_surface=pygame.image.load(os.path.join('graphics','bullet.png')).convert_alpha()
-        self.bullet_animations=[
-            pygame.image.load(os.path.join('graphics','fire','0.png')).convert_alpha(),
-            pygame.image.load(os.path.join('graphics','fire','1.png')).convert_alpha()
-        ]
+        self.bullet_cache=DirectionalSprites(
+            load_image(os.path.join('graphics','bullet.png')),
+            [
+                load_image(os.path.join('graphics','fire','0.png')),
+                load_image(os.path.join('graphics','fire','1.png'))
+            ]
+        )
+        self.bullets=BulletPool(self.bullet_cache,self.settings,self.sim_clock)
+        self.all_sprites.add_batch(self.bullets)
         self.setup()
+        if headless:
+            return
         self.overlay=Overlay(self.player)
 
         # music
-        self.music=pygame.mixer.Sound(os.path.join('audio','music.wav'))
+        self.music=Music(self.settings['music']['playlist'],self.settings['music']['volume'])
     
     def setup(self):
-        map_tmx=load_pygame(os.path.join('data','map.tmx'))
-        # tiles
-        for x,y,surface in map_tmx.get_layer_by_name('Level').tiles():
-            CollisionTile((x*64,y*64), surface, [self.all_sprites,self.collision_sprites])
+        map_tmx=load_level(self.level)
+        chunked=self.settings['chunked_render']
+        # tiles are only drawn one by one when nothing was baked
+        draw_tiles=not (chunked or self.headless)
+        level=map_tmx.get_layer_by_name('Level')
+        if self.settings['collision_backend']=='grid':
+            self.collision_sprites=TileGridGroup(TileGrid(level,64))
+            if draw_tiles:
+                for x,y,surface in level.tiles():
+                    Tile((x*64,y*64),surface,self.all_sprites,self.settings['layers']['Level'])
+        else:
+            tile_groups=[self.all_sprites,self.collision_sprites] if draw_tiles else [self.collision_sprites]
+            for x,y,surface in level.tiles():
+                CollisionTile((x*64,y*64), surface, tile_groups)
         # layers
-        for _ in ['BG','BG Detail','FG Detail Bottom','FG Detail Top']:
-            for x,y,surface in map_tmx.get_layer_by_name(_).tiles():
-                Tile((x*64,y*64),surface,self.all_sprites,self.settings['layers'][_])
+        if chunked and not self.headless:
+            self.all_sprites.bake(map_tmx)
+        elif draw_tiles:
+            for _ in ['BG','BG Detail','FG Detail Bottom','FG Detail Top']:
+                for x,y,surface in map_tmx.get_layer_by_name(_).tiles():
+                    Tile((x*64,y*64),surface,self.all_sprites,self.settings['layers'][_])
         # entities
         for obj in map_tmx.get_layer_by_name('Entities'):
             if obj.name=='Player':
@@ -83,16 +179,20 @@ class Game:
                     [self.all_sprites,self.vulnerable_sprites],
                     os.path.join('graphics','player'),
                     self.collision_sprites,
-                    self.shoot
+                    self.shoot,
+                    self.sim_clock,
+                    self.controller
                 )
             if obj.name=='Enemy':
-                Enemy(
+                enemy=Enemy(
                     (obj.x,obj.y),
                     [self.all_sprites,self.vulnerable_sprites],
                     os.path.join('graphics','enemies'),
                     self.shoot,self.player,
-                    self.collision_sprites
+                    self.collision_sprites,
+                    self.sim_clock
                 )
+                self.activation.add(enemy)
         self.platform_border_rects=[]
 
         # platforms
@@ -102,24 +202,37 @@ class Game:
             else:
                 border_rect=pygame.Rect(obj.x,obj.y,obj.width,obj.height)
                 self.platform_border_rects.append(border_rect)
+        for platform in self.platform_sprites:
+            platform.bind(self.platform_border_rects)
 
     def bullet_collisions(self):
-        # obstacle
-        for obstacle in self.collision_sprites.sprites():
-            pygame.sprite.spritecollide(obstacle,self.bullet_sprites,True)
-        
-        # entity
-        for sprite in self.vulnerable_sprites.sprites():
-            if pygame.sprite.spritecollide(sprite, self.bullet_sprites,True,pygame.sprite.collide_mask):
-                sprite.damage()
+        # only sprites sharing a grid cell with a bullet are tested against it
+        hit_sprites={}
+        for index,rect in self.bullets.rects():
+            # obstacle
+            if rect.collidelist([obstacle.rect for obstacle in self.collision_sprites.near(rect)])!=-1:
+                self.bullets.kill(index)
+                continue
+
+            # entity, the first one in group order takes the bullet
+            for sprite in self.vulnerable_sprites.near(rect):
+                # a sleeping enemy first plays the animation it slept through, this tick included
+                if getattr(sprite,'dormant',False):
+                    sprite.catch_up(self.sim_clock.ticks+1)
+                if sprite.mask.overlap(self.bullets.mask(index),(rect.x-sprite.rect.x,rect.y-sprite.rect.y)):
+                    self.bullets.kill(index)
+                    hit_sprites[sprite]=None
+                    break
+        for sprite in hit_sprites:
+            sprite.damage()
 
     def shoot(self,position,direction,entity):
-        Bullet(position, self.bullet_surface, direction,[self.all_sprites,self.bullet_sprites],self.settings)
-        FireAnimation(position, direction, self.bullet_animations, self.all_sprites,self.settings,entity)
+        self.bullets.spawn(position,direction,entity)
+        FireAnimation(position, direction, self.bullet_cache, self.all_sprites,self.settings,entity)
 
     def platform_collisions(self):
         for platform in self.platform_sprites.sprites():
-            for border in self.platform_border_rects:
+            for border in platform.borders:
                 if platform.rect.colliderect(border):
                     if platform.direction.y<0:
                         platform.rect.top=border.bottom
@@ -133,39 +246,113 @@ class Game:
                 platform.rect.bottom=self.player.rect.top
                 platform.position.y=platform.rect.centery
                 platform.direction.y=-1
+            relocate(platform)
+
+    def advance(self,frame_time):
+        # the simulation runs in fixed ticks, the time left over is blended when drawing
+        sounds.next_frame(self.player.rect.center)
+        self.accumulator+=min(frame_time,self.settings['max_frame_time'])
+        while self.accumulator>=self.sim_clock.step:
+            self.tick()
+            self.accumulator-=self.sim_clock.step
+        return self.accumulator/self.sim_clock.step
+
+    def tick(self):
+        self.all_sprites.snapshot()
+        self.update(self.sim_clock.step)
+        self.sim_clock.advance()
+
+    def update(self,dt):
+        profiler=self.profiler
+        profiler.time('activation',self.activation.update,self.player.rect.center)
+        profiler.time('platform_collisions',self.platform_collisions)
+        # bullets fired during this update only start moving next frame
+        profiler.time('bullets.update',self.bullets.update,dt)
+        profiler.update_sprites(self.all_sprites,dt)
+        profiler.time('bullet_collisions',self.bullet_collisions)
+        profiler.count({
+            'all_sprites':self.all_sprites,'collision_sprites':self.collision_sprites,
+            'vulnerable_sprites':self.vulnerable_sprites,'platform_sprites':self.platform_sprites,
+            'bullets':self.bullets,'awake':self.activation.awake
+        })
+
+    def draw(self,alpha=1):
+        profiler=self.profiler
+        self.display_surface.fill((249,131,103))
+        profiler.time('custom_draw',self.all_sprites.custom_draw,self.player,alpha)
+        overlay_rect=profiler.time('overlay',self.overlay.display)
+        if profiler.enabled:
+            profiler_rect=profiler.draw(self.display_surface)
+            if self.dirty_rects:
+                self.dirty_rects.track(profiler,profiler_rect,tuple(profiler.lines))
+
+        # update display
+        if self.dirty_rects:
+            self.dirty_rects.track(self.overlay,overlay_rect,self.player.health)
+            profiler.time('display.update',self.dirty_rects.update)
+        else:
+            profiler.time('display.update',pygame.display.update)
+
+    def debug_keys(self,event):
+        # F3 shows the profiler, F4 writes its numbers to disk
+        if event.type==pygame.KEYDOWN:
+            if event.key==pygame.K_F3:
+                self.profiler.toggle()
+            elif event.key==pygame.K_F4:
+                self.profiler.dump(self.settings['profiler']['dump'])
 
     def run(self):
-        self.music.play(loops=-1)
         frame_count = 0
         while True:
-            dt=self.clock.tick(60)/1000
+            frame_time=self.clock.tick(60)/1000
             frame_count += 1
             
             # Print status every 60 frames (1 second)
             if frame_count % 60 == 0:
                 print(f"Game running... Frame: {frame_count}, Player health: {self.player.health}")
             
-            for event in pygame.event.get():
+            for event in self.profiler.time('events',pygame.event.get):
                 if event.type==pygame.QUIT:
                     pygame.quit()
                     sys.exit()
+                self.debug_keys(event)
             
-            # update sprites
-            self.platform_collisions()
-            self.all_sprites.update(dt)
-            self.bullet_collisions()
-
-            # draw sprites
-            self.display_surface.fill((249,131,103))
-            self.all_sprites.custom_draw(self.player)
-            self.overlay.display()
+            alpha=self.advance(frame_time)
+            if not self.player.alive():
+                pygame.quit()
+                sys.exit()
+            self.draw(alpha)
+            self.music.update()
 
-            # update display
-            pygame.display.update()
+    def run_headless(self,ticks):
+        # steps as fast as the CPU allows until the tick budget runs out or the player dies
+        start=time.perf_counter()
+        while self.sim_clock.ticks<ticks and self.player.alive():
+            self.tick()
+        elapsed=time.perf_counter()-start
+        rate=self.sim_clock.ticks/elapsed if elapsed else 0
+        print(f"Simulated {self.sim_clock.ticks} ticks in {elapsed:.2f}s ({rate:.0f} ticks/s), player health: {self.player.health}")
+        if self.profiler.enabled:
+            self.profiler.dump(self.settings['profiler']['dump'])
+        return rate
 
 if __name__=='__main__':
-    print("Starting Contra game...")
-    game=Game()
-    print("Game initialized successfully!")
-    print("Game is running in headless mode. Press Ctrl+C to exit.")
-    game.run()
\ No newline at end of file
+    parser=argparse.ArgumentParser(description='Contra')
+    parser.add_argument('--headless',action='store_true',help='simulate without window, sound or frame cap')
+    parser.add_argument('--ticks',type=int,default=12000,help='ticks to simulate in headless mode')
+    parser.add_argument('--controller',choices=['random','idle'],default='random',help='input for the headless player')
+    parser.add_argument('--seed',type=int,default=None,help='seed of the random controller')
+    parser.add_argument('--profile',action='store_true',help='profile the headless run and dump the numbers at the end')
+    args=parser.parse_args()
+    if args.headless:
+        controller=RandomController(args.seed) if args.controller=='random' else IdleController()
+        game=Game(headless=True,controller=controller)
+        if args.profile and not game.profiler.enabled:
+            game.profiler.toggle()
+        game.run_headless(args.ticks)
+    else:
+        print("Starting Contra game...")
+        game=Game()
+        print("Game initialized successfully!")
+        print("Game is running in headless mode. Press Ctrl+C to exit.")
+        game.run()
\ No newline at end of file
@@ -0,0 +1,34 @@
+import os
+import pygame
+
+class Music:
+    # the playlist is streamed from disk through mixer.music, so only a small buffer of the
+    # current track is ever decoded. anything the mixer reads works, ogg and mp3 included
+    def __init__(self,playlist,volume=1):
+        self.playlist=list(playlist)
+        self.volume=volume
+        self.index=-1
+
+    def next_track(self):
+        # missing or unreadable tracks are skipped
+        for _ in range(len(self.playlist)):
+            self.index=(self.index+1)%len(self.playlist)
+            path=self.playlist[self.index]
+            if not os.path.isfile(path):
+                continue
+            try:
+                pygame.mixer.music.load(path)
+            except pygame.error:
+                continue
+            pygame.mixer.music.set_volume(self.volume)
+            pygame.mixer.music.play()
+            return True
+        return False
+
+    def update(self):
+        # called once per frame, so the first track only starts once the first frame is shown
+        if not self.playlist or not pygame.mixer.get_init() or pygame.mixer.music.get_busy():
+            return
+        if not self.next_track():
+            # nothing playable, the game runs silent
+            self.playlist=[]
@@ -1,14 +1,17 @@
 import pygame
 import os
+from assets import load_image
 
 class Overlay:
     def __init__(self,player):
         self.player=player
         self.display_surface=pygame.display.get_surface()
-        self.health_surface=pygame.image.load(os.path.join('graphics','health.png')).convert_alpha()
+        self.health_surface=load_image(os.path.join('graphics','health.png'))
     
     def display(self):
+        rect=pygame.Rect(10,10,0,0)
         for i in range(self.player.health):
             x=10+i*(self.health_surface.get_width()+4)
             y=10
-            self.display_surface.blit(self.health_surface,(x,y))
\ No newline at end of file
+            rect.union_ip(self.display_surface.blit(self.health_surface,(x,y)))
+        return rect
\ No newline at end of file
@@ -0,0 +1,38 @@
+import os
+import pygame
+from pytmx import TiledImageLayer
+from assets import load_image
+from level import CompiledImageLayer
+
+class ParallaxLayer:
+    def __init__(self,surface,position,factor,count):
+        self.surface=surface
+        self.x,self.y=position
+        self.factor=factor
+        self.count=count
+        self.width,self.height=surface.get_size()
+
+    def draw(self,surface,offset):
+        x=self.x-offset.x/self.factor.x
+        y=self.y-offset.y/self.factor.y
+        if y>=surface.get_height() or y+self.height<=0:
+            return
+        # only the repeats overlapping the window
+        first=max(0,int(-x//self.width))
+        last=min(self.count-1,int((surface.get_width()-x)//self.width))
+        for i in range(first,last+1):
+            surface.blit(self.surface,(self.x+i*self.width-offset.x/self.factor.x,y))
+
+def load_parallax_layers(tmx_map):
+    # image layers of the map, offsetx/offsety place the first repeat and parallaxx/parallaxy set the scroll speed
+    map_width=tmx_map.tilewidth*tmx_map.width
+    layers=[]
+    for layer in tmx_map.layers:
+        if isinstance(layer,(TiledImageLayer,CompiledImageLayer)):
+            # pytmx can hand image layers a gid that clashes with a tile, so the image is loaded directly
+            surface=load_image(os.path.join(os.path.dirname(tmx_map.filename),layer.source))
+            position=(float(getattr(layer,'offsetx',0)),float(getattr(layer,'offsety',0)))
+            factor=pygame.math.Vector2(1/float(getattr(layer,'parallaxx',1)),1/float(getattr(layer,'parallaxy',1)))
+            count=int((map_width-2*position[0])//surface.get_width())
+            layers.append(ParallaxLayer(surface,position,factor,count))
+    return layers
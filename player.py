@@ -3,15 +3,16 @@ import pygame
 from pygame.math import Vector2 as vector
 import json
 from entity import Entity
-import sys
+from groups import relocate
 
 class Player(Entity):
-    def __init__(self,position,group,path,collision_sprites,shoot):
-        super().__init__(position, group, path, shoot)
+    def __init__(self,position,group,path,collision_sprites,shoot,clock,controller):
+        super().__init__(position, group, path, shoot, clock)
         self.shoot=shoot
+        self.controller=controller
 
         # movement
-        self.gravity=40
+        self.gravity=2400
         self.jump_speed=1100
         self.on_floor=False
         self.moving_floor=None
@@ -32,7 +33,7 @@ class Player(Entity):
     def check_contact(self):
         bottom_rect=pygame.Rect(0,0,self.rect.width,5)
         bottom_rect.midtop=self.rect.midbottom
-        for sprite in self.collision_sprites.sprites():
+        for sprite in self.collision_sprites.near(bottom_rect):
             if sprite.rect.colliderect(bottom_rect):
                 if self.direction.y>0:
                     self.on_floor=True
@@ -40,7 +41,9 @@ class Player(Entity):
                     self.moving_floor=sprite
 
     def collision(self,direction):
-        for sprite in self.collision_sprites.sprites():
+        # resolving only moves the rect back towards old_rect, and platforms move a few pixels per frame at most
+        area=self.rect.union(self.old_rect).inflate(128,128)
+        for sprite in self.collision_sprites.near(area):
             if sprite.rect.colliderect(self.rect):
                 if direction=='horizontal':
                     # left collision
@@ -63,27 +66,22 @@ class Player(Entity):
         if self.on_floor and self.direction.y!=0:
             self.on_floor=False
 
-    def check_death(self):
-        if self.health<=0:
-            pygame.quit()
-            sys.exit()
-
     def input(self):
-        keys=pygame.key.get_pressed()
+        controls=self.controller.read()
         # horizontal movement
-        if keys[pygame.K_LEFT] or keys[pygame.K_a]:
+        if controls.left:
             self.direction.x=-1
             self.status='left'
-        elif keys[pygame.K_RIGHT] or keys[pygame.K_d]:
+        elif controls.right:
             self.direction.x=1
             self.status='right'
         else:
             self.direction.x=0
         
         # vertical movement
-        if (keys[pygame.K_UP] or keys[pygame.K_w]) and self.on_floor:
+        if controls.jump and self.on_floor:
             self.direction.y=-self.jump_speed
-        elif keys[pygame.K_DOWN] or keys[pygame.K_s] or keys[pygame.K_LCTRL]:
+        elif controls.duck:
             self.duck=True
         else:
             self.duck=False
@@ -91,14 +89,15 @@ class Player(Entity):
             self.direction.x=0
         
         # shoot
-        if keys[pygame.K_SPACE] and self.can_shoot:
+        if controls.shoot and self.can_shoot:
             direction=vector(1,0) if self.status.split('_')[0]=='right' else vector(-1,0)
             position=self.rect.center+direction*80
             y_offset=vector(0,-16) if not self.duck else vector(0,10)
             self.shoot(position+y_offset,direction,self)
-            self.bullet_sound.play()
+            self.bullet_sound.play(self.rect.center)
             self.can_shoot=False
-            self.shoot_time=pygame.time.get_ticks()
+            # reloading used to be checked at the end of the update, so it shows one tick later
+            self.clock.schedule(self.cooldown,self.reload,1)
     
     def move(self,dt):
         # horizontal movement
@@ -107,7 +106,7 @@ class Player(Entity):
         self.collision('horizontal')
     
         # vertical movement
-        self.direction.y+=self.gravity
+        self.direction.y+=self.gravity*dt
         self.position.y+=self.direction.y*dt
 
         # glue the player to the platform
@@ -120,6 +119,7 @@ class Player(Entity):
         self.rect.y=round(self.position.y)
         self.collision('vertical')
         self.moving_floor=None
+        relocate(self)
     
     def update(self,dt):
         self.old_rect=self.rect.copy()
@@ -130,9 +130,5 @@ class Player(Entity):
         self.animate(dt)
         self.blink()
 
-        # timers
-        self.shoot_timer()
-        self.invul_timer()
-
         # death check
         self.check_death()
\ No newline at end of file
@@ -0,0 +1,87 @@
+import json
+from collections import deque
+from time import perf_counter
+import numpy as np
+import pygame
+
+class Profiler:
+    # rolling timings in milliseconds of every phase of the loop, one sample per call.
+    # while disabled each phase costs one extra function call
+    def __init__(self,window=600,enabled=False):
+        self.window=window
+        self.enabled=enabled
+        self.samples={}
+        self.counts={}
+
+        # debug panel, its text is only rebuilt every few frames
+        self.font=None
+        self.lines=[]
+        self.frames=0
+
+    def toggle(self):
+        # every run starts from empty histograms
+        self.enabled=not self.enabled
+        if self.enabled:
+            self.samples.clear()
+            self.counts.clear()
+
+    def record(self,phase,milliseconds):
+        if phase not in self.samples:
+            self.samples[phase]=deque(maxlen=self.window)
+        self.samples[phase].append(milliseconds)
+
+    def time(self,phase,function,*args):
+        if not self.enabled:
+            return function(*args)
+        start=perf_counter()
+        result=function(*args)
+        self.record(phase,(perf_counter()-start)*1000)
+        return result
+
+    def update_sprites(self,group,*args):
+        # LayeredGroup.update with the time split by sprite class
+        if not self.enabled:
+            group.update(*args)
+            return
+        group.flush()
+        totals={}
+        for sprite in list(group.dynamic):
+            start=perf_counter()
+            sprite.update(*args)
+            name=f'update {type(sprite).__name__}'
+            totals[name]=totals.get(name,0)+perf_counter()-start
+        for name,total in totals.items():
+            self.record(name,total*1000)
+
+    def count(self,groups):
+        if self.enabled:
+            for name,group in groups.items():
+                self.counts[name]=len(group)
+
+    def report(self):
+        phases={}
+        for phase,samples in self.samples.items():
+            p50,p95,p99=np.percentile(np.fromiter(samples,dtype=float),(50,95,99))
+            phases[phase]={'p50':p50,'p95':p95,'p99':p99,'samples':len(samples)}
+        return {'window':self.window,'phases':phases,'sprites':dict(self.counts)}
+
+    def dump(self,path):
+        with open(path,'w') as f:
+            json.dump(self.report(),f,indent=4)
+
+    def draw(self,surface):
+        if self.frames%30==0:
+            report=self.report()
+            self.lines=['phase  p50  p95  p99 ms']
+            self.lines.extend(f"{phase}  {stats['p50']:.2f}  {stats['p95']:.2f}  {stats['p99']:.2f}" for phase,stats in report['phases'].items())
+            self.lines.extend(f'{name}: {count}' for name,count in report['sprites'].items())
+        self.frames+=1
+        if not self.font:
+            self.font=pygame.font.Font(None,20)
+
+        # top right, below nothing the game draws
+        rect=pygame.Rect(surface.get_width()-10,10,0,0)
+        for index,line in enumerate(self.lines):
+            text=self.font.render(line,True,(255,255,255),(0,0,0))
+            rect.union_ip(surface.blit(text,text.get_rect(topright=(surface.get_width()-10,10+index*18))))
+        return rect
@@ -0,0 +1,66 @@
+import os
+import time
+import argparse
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from main import Game
+from controllers import IdleController,RandomController,ScriptedController
+
+# script is a list of Controls for the scripted policy, seed feeds the random one
+Episode=namedtuple('Episode',['policy','seed','ticks','script'],defaults=[None])
+
+def make_controller(episode):
+    if episode.policy=='random':
+        return RandomController(episode.seed)
+    if episode.policy=='scripted':
+        return ScriptedController(episode.script)
+    return IdleController()
+
+def init_worker():
+    # the map, animations and images are cached per process, a throwaway game fills the caches
+    # so episodes only build their sprites
+    Game(headless=True,controller=IdleController())
+
+def run_episode(episode):
+    game=Game(headless=True,controller=make_controller(episode))
+    enemies=[sprite for sprite in game.vulnerable_sprites if sprite is not game.player]
+    while game.sim_clock.ticks<episode.ticks and game.player.alive():
+        game.tick()
+    return {
+        'policy':episode.policy,
+        'seed':episode.seed,
+        'frames':game.sim_clock.ticks,
+        'enemies_killed':sum(not enemy.alive() for enemy in enemies),
+        'health':game.player.health
+    }
+
+def run_episodes(episodes,workers=None):
+    workers=workers or os.cpu_count()
+    start=time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers,initializer=init_worker) as pool:
+        results=list(pool.map(run_episode,episodes))
+    elapsed=time.perf_counter()-start
+    frames=sum(result['frames'] for result in results)
+    summary={
+        'episodes':len(results),
+        'workers':workers,
+        'seconds':elapsed,
+        'frames':frames,
+        'frames_per_second':frames/elapsed if elapsed else 0,
+        'episodes_per_second':len(results)/elapsed if elapsed else 0
+    }
+    return results,summary
+
+if __name__=='__main__':
+    parser=argparse.ArgumentParser(description='run Contra episodes in parallel')
+    parser.add_argument('--episodes',type=int,default=16,help='number of episodes')
+    parser.add_argument('--ticks',type=int,default=3000,help='tick budget of each episode')
+    parser.add_argument('--workers',type=int,default=None,help='worker processes, defaults to the core count')
+    parser.add_argument('--policy',choices=['random','idle'],default='random',help='input of every episode')
+    parser.add_argument('--seed',type=int,default=0,help='seed of the first episode, the others count up from it')
+    args=parser.parse_args()
+    episodes=[Episode(args.policy,args.seed+index,args.ticks) for index in range(args.episodes)]
+    results,summary=run_episodes(episodes,args.workers)
+    for result in results:
+        print(f"{result['policy']} seed {result['seed']}: {result['frames']} frames, {result['enemies_killed']} enemies killed, health {result['health']}")
+    print(f"{summary['episodes']} episodes on {summary['workers']} workers in {summary['seconds']:.2f}s ({summary['frames_per_second']:.0f} frames/s)")
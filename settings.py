@@ -0,0 +1,10 @@
+import json
+
+loaded={}
+
+def load_settings(path='settings.json'):
+    # parsed once per process, every reader shares the same dict
+    if path not in loaded:
+        with open(path) as f:
+            loaded[path]=json.load(f)
+    return loaded[path]
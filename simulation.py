@@ -0,0 +1,40 @@
+from heapq import heappush,heappop
+from itertools import count
+
+class SimulationClock:
+    def __init__(self,tick_rate):
+        self.step=1/tick_rate
+        self.ticks=0
+
+        # timers, kept in a heap by the tick they are due on
+        self.timers=[]
+        self.counter=count()
+
+    def advance(self):
+        self.ticks+=1
+        # due timers fire before the tick starts, idle ones are never looked at
+        while self.timers and self.timers[0][0]<=self.ticks:
+            callback=heappop(self.timers)[2]
+            if callback:
+                callback()
+
+    def get_ticks(self):
+        # milliseconds of simulated time, a drop-in for pygame.time.get_ticks
+        return int(self.ticks*self.step*1000)
+
+    def tick_after(self,time):
+        # the first tick whose get_ticks is past time
+        ticks=max(int(time/(self.step*1000))-1,0)
+        while int(ticks*self.step*1000)<=time:
+            ticks+=1
+        return ticks
+
+    def schedule(self,duration,callback,lag=0):
+        # calls back on the first tick more than duration milliseconds from now, lag ticks later
+        timer=[self.tick_after(self.get_ticks()+duration)+lag,next(self.counter),callback]
+        heappush(self.timers,timer)
+        return timer
+
+    def cancel(self,timer):
+        # cancelled timers stay in the heap until they are due and are skipped then
+        timer[2]=None
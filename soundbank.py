@@ -0,0 +1,74 @@
+import pygame
+
+class SilentSound:
+    def play(self,*args,**kwargs):
+        pass
+
+    def set_volume(self,volume):
+        pass
+
+class Effect:
+    def __init__(self,bank,sound,category):
+        self.bank=bank
+        self.sound=sound
+        self.category=category
+
+    def play(self,position=None):
+        self.bank.play(self,position)
+
+    def set_volume(self,volume):
+        self.sound.set_volume(volume)
+
+class SoundBank:
+    # decodes every effect once and plays each category on channels of its own,
+    # so a firefight can never take more voices than its categories were given
+    def __init__(self):
+        self.effects={}
+        self.channels={}
+        self.played=set()
+        self.view=None
+
+    def setup(self,categories,width,height):
+        # the first channels of the mixer are reserved, find_channel and Sound.play never pick them
+        if not pygame.mixer.get_init() or self.channels:
+            return
+        total=sum(categories.values())
+        if pygame.mixer.get_num_channels()<total+8:
+            pygame.mixer.set_num_channels(total+8)
+        pygame.mixer.set_reserved(total)
+        first=0
+        for category,count in categories.items():
+            self.channels[category]=[pygame.mixer.Channel(index) for index in range(first,first+count)]
+            first+=count
+        self.view=pygame.Rect(0,0,width,height)
+
+    def load(self,path,category,volume=1):
+        if not pygame.mixer.get_init():
+            return SilentSound()
+        if path not in self.effects:
+            sound=pygame.mixer.Sound(path)
+            sound.set_volume(volume)
+            self.effects[path]=Effect(self,sound,category)
+        return self.effects[path]
+
+    def next_frame(self,center):
+        self.played.clear()
+        if self.view:
+            self.view.center=center
+
+    def play(self,effect,position=None):
+        # an effect sounds at most once per frame and not at all from off screen
+        if effect in self.played:
+            return
+        if position is not None and self.view and not self.view.collidepoint(position):
+            return
+        self.played.add(effect)
+        channels=self.channels.get(effect.category)
+        if not channels:
+            effect.sound.play()
+            return
+        # the least recently started channel is first, it is cut off when all of them are busy
+        channel=next((channel for channel in channels if not channel.get_busy()),channels[0])
+        channels.remove(channel)
+        channels.append(channel)
+        channel.play(effect.sound)
@@ -0,0 +1,62 @@
+from itertools import count
+
+class SpatialGrid:
+    def __init__(self,cell_size=64):
+        self.cell_size=cell_size
+        self.cells={}
+        self.spans={}
+        self.order={}
+        self.counter=count()
+
+    def span(self,rect):
+        size=self.cell_size
+        return (
+            rect.left//size,
+            rect.top//size,
+            max(rect.right-1,rect.left)//size,
+            max(rect.bottom-1,rect.top)//size
+        )
+
+    def link(self,sprite,span):
+        left,top,right,bottom=span
+        for cx in range(left,right+1):
+            for cy in range(top,bottom+1):
+                self.cells.setdefault((cx,cy),{})[sprite]=None
+        self.spans[sprite]=span
+
+    def unlink(self,sprite):
+        left,top,right,bottom=self.spans.pop(sprite)
+        for cx in range(left,right+1):
+            for cy in range(top,bottom+1):
+                cell=self.cells[(cx,cy)]
+                del cell[sprite]
+                if not cell:
+                    del self.cells[(cx,cy)]
+
+    def insert(self,sprite):
+        self.order[sprite]=next(self.counter)
+        self.link(sprite,self.span(sprite.rect))
+
+    def remove(self,sprite):
+        self.unlink(sprite)
+        del self.order[sprite]
+
+    def relocate(self,sprite):
+        span=self.span(sprite.rect)
+        if span!=self.spans[sprite]:
+            self.unlink(sprite)
+            self.link(sprite,span)
+
+    def query(self,rect):
+        # results keep insertion order so overlapping sprites resolve the same way as a full scan
+        left,top,right,bottom=self.span(rect)
+        found={}
+        for cx in range(left,right+1):
+            for cy in range(top,bottom+1):
+                cell=self.cells.get((cx,cy))
+                if cell:
+                    found.update(cell)
+        return sorted(found,key=self.order.__getitem__)
+
+    def __iter__(self):
+        return iter(self.order)
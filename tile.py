@@ -1,9 +1,12 @@
 import os
-import json
 from pygame.math import Vector2 as vector
 import pygame
+from groups import relocate
+from settings import load_settings
 
 class Tile(pygame.sprite.Sprite):
+    static=True
+
     def __init__(self,position,surface,group,z):
         super().__init__(group)
         self.image=surface
@@ -15,22 +18,37 @@ class Tile(pygame.sprite.Sprite):
 
 class CollisionTile(Tile):
     def __init__(self, position, surface, group):
-        f=open('settings.json')
-        self.settings=json.load(f)
-        del f
+        self.settings=load_settings()
         super().__init__(position, surface, group,self.settings['layers']['Level'])
         self.old_rect=self.rect.copy()
         
 class MovingPlatform(CollisionTile):
+    static=False
+
     def __init__(self, position, surface, group):
         super().__init__(position, surface, group)
         self.direction=vector(0,-1)
         self.speed=200
         self.position=vector(self.rect.center)
+        self.borders=[]
+
+    def bind(self,borders):
+        # only the closest border above and below in the platform's column can stop it
+        column=[border for border in borders if border.left<self.rect.right and border.right>self.rect.left]
+        above=[border for border in column if border.centery<self.rect.centery]
+        below=[border for border in column if border.centery>=self.rect.centery]
+        limits=[]
+        if above:
+            limits.append(max(above,key=lambda border:border.bottom))
+        if below:
+            limits.append(min(below,key=lambda border:border.top))
+        # kept in map order so bounces resolve like they did against the full list
+        self.borders=[border for border in borders if any(border is limit for limit in limits)]
     
     def move(self,dt):
         self.position.y+=self.direction.y*self.speed*dt
         self.rect.centery=round(self.position.y)
+        relocate(self)
     
     def update(self,dt):
         self.old_rect=self.rect.copy()
@@ -0,0 +1,47 @@
+import numpy as np
+import pygame
+from groups import GridGroup
+
+class SolidTile:
+    # stands in for a CollisionTile, static geometry never moves so old_rect is rect
+    def __init__(self,rect):
+        self.rect=rect
+        self.old_rect=rect
+
+class TileGrid:
+    def __init__(self,layer,tile_size):
+        self.tile_size=tile_size
+        self.solid=np.zeros((layer.height,layer.width),dtype=bool)
+        for x,y,surface in layer.tiles():
+            self.solid[y,x]=True
+        self.tiles={}
+
+    def tile(self,x,y):
+        if (x,y) not in self.tiles:
+            self.tiles[(x,y)]=SolidTile(pygame.Rect(x*self.tile_size,y*self.tile_size,self.tile_size,self.tile_size))
+        return self.tiles[(x,y)]
+
+    def cells(self,rect):
+        height,width=self.solid.shape
+        left=max(rect.left//self.tile_size,0)
+        top=max(rect.top//self.tile_size,0)
+        right=min(max(rect.right-1,rect.left)//self.tile_size,width-1)
+        bottom=min(max(rect.bottom-1,rect.top)//self.tile_size,height-1)
+        return left,top,right,bottom
+
+    def near(self,rect):
+        # row-major, the order the Level layer used to create its CollisionTiles in
+        left,top,right,bottom=self.cells(rect)
+        if left>right or top>bottom:
+            return []
+        rows,columns=np.nonzero(self.solid[top:bottom+1,left:right+1])
+        return [self.tile(left+x,top+y) for y,x in zip(rows.tolist(),columns.tolist())]
+
+class TileGridGroup(GridGroup):
+    # static geometry comes from the occupancy grid, only moving platforms are sprites
+    def __init__(self,tile_grid,cell_size=64):
+        super().__init__(cell_size)
+        self.tile_grid=tile_grid
+
+    def near(self,rect):
+        return self.tile_grid.near(rect)+super().near(rect)